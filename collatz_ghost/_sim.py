@@ -0,0 +1,75 @@
+from __future__ import annotations
+from typing import Optional, Tuple
+from . import _solver_numba
+
+# Single source of truth for the prefix simulation: solver and verifier both
+# run this loop (the verifier used to carry a hand-synced duplicate), so any
+# fast path added here speeds up both sides and they cannot drift apart.
+
+# Bit masks for reductions mod 2^n: `x & _MASKS[n]` takes the fast bitand
+# path, where `x % (1 << n)` goes through full bignum division. The table
+# covers every precision this loop sees in practice; _mask falls back for
+# exotic k.
+_MASKS = tuple((1 << i) - 1 for i in range(128))
+
+def _mask(n: int) -> int:
+    return _MASKS[n] if n < 128 else (1 << n) - 1
+
+def simulate_prefix_mod(pattern: list[int], x0: int, m: int, start: int = 0) -> Tuple[int, int, int, Optional[Tuple[int, str]]]:
+    """Simulate as far as possible with current precision m (mod 2^m for x0).
+    Returns (xM_mod, m_out, steps_done, contradiction) where steps_done is the
+    index of the first unprocessed step (== len(pattern) when complete) and
+    contradiction=(step_index, reason) or None.
+    We stop when we lack enough precision to check the next valuation constraint exactly.
+    `start` lets callers resume from a previously saved simulation state.
+    """
+    x = x0 & _mask(m)
+    # x should be odd in the odd-iterate model
+    if x % 2 == 0:
+        return (x, m, start, (0, "x0 even; odd-iterate required"))
+    for i in range(start, len(pattern)):
+        a = pattern[i]
+        # Need to check v2(3x+1)=a using only x mod 2^{a+1}
+        need = a + 1
+        if m < need:
+            # can't decide this step yet
+            return (x, m, i, None)
+        tmask = _mask(need)
+        val = (3 * (x & tmask) + 1) & tmask
+        # exact valuation means 3x+1 ≡ 2^a (mod 2^{a+1})
+        if val != (1 << a) & tmask:
+            return (x, m, i, (i+1, f"valuation mismatch: (3x+1) mod 2^{a+1} != 2^a"))
+        # compute x_next = (3x+1)/2^a mod 2^{m-a}
+        # we know numerator divisible by 2^a under constraint
+        num = (3 * x + 1)
+        # reduce to integer by exact division (safe because constraint enforced mod 2^{a+1}, but
+        # for true integer we only know mod; still, in modular arithmetic this is well-defined for quotient mod 2^{m-a})
+        # We take num modulo 2^m before division to avoid huge ints
+        num_mod = num & _mask(m)
+        q = (num_mod >> a)  # division by 2^a in Z/2^m works by shifting
+        m = m - a
+        if m <= 0:
+            m = 1
+        x = q & _mask(m)
+        # x should be odd (since exact valuation makes q odd)
+        if x % 2 == 0:
+            return (x, m, i+1, (i+1, "quotient even; should be odd under exact valuation"))
+    return (x, m, len(pattern), None)
+
+def make_simulator(pattern: list[int], k: int):
+    """Return a callable (x0, m, start) -> same result tuple as simulate_prefix_mod.
+
+    Uses the Numba int64 fast path when the pattern/precision provably fit
+    in 64-bit arithmetic; falls back to the exact Python loop otherwise.
+    """
+    if _solver_numba.fits_i64(pattern, k):
+        pat_arr = _solver_numba.as_i64_array(pattern)
+
+        def sim(x0: int, m: int, start: int = 0):
+            # Verifier input can claim precisions past k; re-check per call.
+            if m <= _solver_numba._MAX_M:
+                return _solver_numba.simulate_prefix_i64(pat_arr, x0 & _mask(m), m, start)
+            return simulate_prefix_mod(pattern, x0, m, start)
+
+        return sim
+    return lambda x0, m, start=0: simulate_prefix_mod(pattern, x0, m, start)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+from typing import Optional, Tuple
+
+# Optional JIT fast path for _simulate_prefix_mod. Numba only supports 64-bit
+# machine integers, so this path is restricted to patterns whose arithmetic
+# provably stays inside int64 (see fits_i64 below); the caller falls back to
+# the exact bignum loop otherwise.
+try:
+    import numpy as np
+    from numba import njit, int64
+    from numba.types import UniTuple
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - numba/numpy are optional
+    np = None
+    HAVE_NUMBA = False
+
+# Contradiction codes returned by sim_i64 (mirrors the tuple messages in
+# solver._simulate_prefix_mod):
+SIM_OK = 0            # ran out of precision or completed; no contradiction
+SIM_X0_EVEN = 1
+SIM_VAL_MISMATCH = 2  # (3x+1) mod 2^{a+1} != 2^a
+SIM_QUOT_EVEN = 3
+
+# 3x+1 on x < 2^m needs m+2 bits, so m <= 60 keeps everything below 2^63.
+_MAX_M = 60
+
+
+def fits_i64(pattern: list[int], k: int) -> bool:
+    """True if the simulation over this pattern at precision <= k stays in int64."""
+    if not HAVE_NUMBA or not pattern:
+        return False
+    return k <= _MAX_M and max(pattern) < _MAX_M
+
+
+if HAVE_NUMBA:
+
+    @njit(UniTuple(int64, 4)(int64[:], int64, int64, int64), cache=True, boundscheck=False)
+    def sim_i64(pat, x0, m, start):  # pragma: no cover - compiled
+        mod = np.int64(1) << m
+        x = x0 % mod
+        if x & 1 == 0:
+            return x, m, np.int64(0), np.int64(SIM_X0_EVEN)
+        for i in range(start, pat.shape[0]):
+            a = pat[i]
+            need = a + 1
+            if m < need:
+                return x, m, i, np.int64(SIM_OK)
+            tmask = (np.int64(1) << need) - 1
+            val = (3 * (x & tmask) + 1) & tmask
+            if val != ((np.int64(1) << a) & tmask):
+                return x, m, i + 1, np.int64(SIM_VAL_MISMATCH)
+            num_mod = (3 * x + 1) & ((np.int64(1) << m) - 1)
+            q = num_mod >> a
+            m = m - a
+            if m <= 0:
+                m = np.int64(1)
+            x = q & ((np.int64(1) << m) - 1)
+            if x & 1 == 0:
+                return x, m, i + 1, np.int64(SIM_QUOT_EVEN)
+        return x, m, np.int64(pat.shape[0]), np.int64(SIM_OK)
+
+    def as_i64_array(pattern: list[int]):
+        return np.asarray(pattern, dtype=np.int64)
+
+    def simulate_prefix_i64(pat_arr, x0: int, m: int, start: int = 0) -> Tuple[int, int, int, Optional[Tuple[int, str]]]:
+        """Adapter matching solver._simulate_prefix_mod's return convention.
+
+        On a contradiction the compiled kernel's step slot carries the
+        1-based contradiction index rather than the resume index; the resume
+        index is unused in that case (the caller makes a leaf, not children).
+        """
+        x_end, m_end, step, code = sim_i64(pat_arr, x0, m, start)
+        if code == SIM_OK:
+            return int(x_end), int(m_end), int(step), None
+        if code == SIM_X0_EVEN:
+            return int(x_end), int(m_end), start, (0, "x0 even; odd-iterate required")
+        if code == SIM_VAL_MISMATCH:
+            a = int(pat_arr[step - 1])
+            return int(x_end), int(m_end), int(step) - 1, (int(step), f"valuation mismatch: (3x+1) mod 2^{a+1} != 2^a")
+        return int(x_end), int(m_end), int(step), (int(step), "quotient even; should be odd under exact valuation")
@@ -2,6 +2,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Tuple
 
+try:
+    from gmpy2 import mpz  # GMP bignum kernels; optional
+except ImportError:
+    mpz = None
+
 @dataclass(frozen=True)
 class AffineMap:
     """Represents an affine map x -> (A*x + B) / 2^E over rationals (exact integers).
@@ -23,11 +28,18 @@ def compose_step(a: int, amap: AffineMap) -> AffineMap:
     return AffineMap(A2, B2, E2)
 
 def compose_pattern(pattern: list[int]) -> AffineMap:
-    """Return the M-fold composition F = T_{a_M}∘...∘T_{a_1} as AffineMap."""
-    amap = AffineMap(1, 0, 0)  # identity
+    """Return the M-fold composition F = T_{a_M}∘...∘T_{a_1} as AffineMap.
+
+    Runs the compose_step recurrence on bare locals (gmpy2 mpz when
+    available) instead of allocating an AffineMap per step; A is just 3^M.
+    """
+    B = mpz(0) if mpz is not None else 0
+    one = mpz(1) if mpz is not None else 1
+    E = 0
     for a in pattern:
-        amap = compose_step(a, amap)
-    return amap
+        B = 3 * B + (one << E)
+        E += a
+    return AffineMap(3 ** len(pattern), int(B), E)
 
 def rational_cycle_candidate(pattern: list[int]) -> Tuple[int, int]:
     """Compute exact rational candidate x0 = B/(2^E - A) for fixed point F(x)=x,
@@ -1,9 +1,14 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
-from .util import sha256_json
+from typing import Any, Dict, List, Optional, Tuple
+from .util import hash_and_canonical
 
-def cert_type_a(pattern: list[int], B: int, D: int, reason: str) -> dict:
+def _canonical_with_hash(obj: dict) -> bytes:
+    # Cheap second pass: only used for certs whose keys sort before "hash".
+    import json
+    return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+def cert_type_a(pattern: list[int], B: int, D: int, reason: str) -> Tuple[dict, bytes]:
     obj = {
         "type": "A",
         "pattern": pattern,
@@ -11,10 +16,11 @@ def cert_type_a(pattern: list[int], B: int, D: int, reason: str) -> dict:
         "D": str(D),
         "reason": reason,
     }
-    obj["hash"] = sha256_json(obj)
-    return obj
+    obj["hash"], _ = hash_and_canonical(obj)
+    return obj, _canonical_with_hash(obj)
 
-def cert_type_b(pattern: list[int], k: int, tree: dict, reason: str) -> dict:
+def cert_type_b(pattern: list[int], k: int, tree: dict, reason: str,
+                nodes: Optional[list] = None) -> Tuple[dict, bytes]:
     obj = {
         "type": "B",
         "pattern": pattern,
@@ -22,21 +28,85 @@ def cert_type_b(pattern: list[int], k: int, tree: dict, reason: str) -> dict:
         "tree": tree,
         "reason": reason,
     }
-    obj["hash"] = sha256_json(obj)
-    return obj
+    if nodes:
+        # shared-leaf table; tree nodes point into it via {"ref": id}
+        obj["nodes"] = nodes
+    digest, data = hash_and_canonical(obj)
+    obj["hash"] = digest
+    # "hash" sorts before every other type-B key (k, pattern, reason, tree,
+    # type), so splice it into the canonical bytes instead of re-serializing
+    # the potentially huge tree a second time.
+    canonical = b'{"hash":"' + digest.encode("ascii") + b'",' + data[1:]
+    return obj, canonical
+
+def _merkle_pair(a: str, b: str) -> str:
+    import hashlib
+    return hashlib.sha256(bytes.fromhex(a) + bytes.fromhex(b)).hexdigest()
 
-def batch_proof_header(family_desc: dict, cert_hashes: list[str]) -> dict:
-    # Merkle-ish: hash of concatenated hashes
+def merkle_root(hashes: list[str]) -> Tuple[str, List[List[str]]]:
+    """Binary Merkle tree over hex leaf hashes (raw digest bytes hashed
+    pairwise, last node duplicated on odd counts).
+    Returns (root, levels) with levels[0] the leaves and levels[-1] == [root].
+    """
     import hashlib
-    h = hashlib.sha256()
-    for ch in cert_hashes:
-        h.update(ch.encode("utf-8"))
-    root = h.hexdigest()
+    if not hashes:
+        return hashlib.sha256(b"").hexdigest(), [[]]
+    levels = [list(hashes)]
+    while len(levels[-1]) > 1:
+        cur = levels[-1]
+        if len(cur) % 2:
+            cur = cur + [cur[-1]]
+        levels.append([_merkle_pair(cur[i], cur[i + 1]) for i in range(0, len(cur), 2)])
+    return levels[-1][0], levels
+
+def merkle_auth_path(levels: List[List[str]], index: int) -> list[str]:
+    """Sibling hashes from leaf `index` up to (not including) the root."""
+    path = []
+    for level in levels[:-1]:
+        sib = index ^ 1
+        if sib >= len(level):
+            sib = index  # odd node paired with itself
+        path.append(level[sib])
+        index >>= 1
+    return path
+
+def merkle_verify_path(leaf: str, index: int, path: list[str], root: str) -> bool:
+    """Recompute the root from a leaf and its authentication path: O(log N)."""
+    h = leaf
+    for sib in path:
+        h = _merkle_pair(h, sib) if index % 2 == 0 else _merkle_pair(sib, h)
+        index >>= 1
+    return h == root
+
+def batch_verify(root: str, proofs: list[Tuple[str, int, list[str]]]) -> bool:
+    """Verify many (leaf, index, path) inclusion proofs against one root,
+    memoizing shared internal nodes so common prefixes are hashed once."""
+    seen: Dict[Tuple[int, int], str] = {}
+    for leaf, index, path in proofs:
+        h = leaf
+        for level, sib in enumerate(path):
+            key = (level + 1, index >> 1)
+            cached = seen.get(key)
+            if cached is None:
+                h = _merkle_pair(h, sib) if index % 2 == 0 else _merkle_pair(sib, h)
+                seen[key] = h
+            else:
+                h = cached
+            index >>= 1
+        if h != root:
+            return False
+    return True
+
+def batch_proof_header(family_desc: dict, cert_hashes: list[str]) -> Tuple[dict, bytes]:
+    # Binary Merkle root over the member hashes: single-cert inclusion can be
+    # checked in O(log N) via merkle_verify_path instead of re-hashing all N.
+    root, levels = merkle_root(cert_hashes)
     obj = {
         "type": "BATCH",
         "family": family_desc,
         "count": len(cert_hashes),
         "root": root,
+        "depth": len(levels) - 1,
     }
-    obj["hash"] = sha256_json(obj)
-    return obj
+    obj["hash"], _ = hash_and_canonical(obj)
+    return obj, _canonical_with_hash(obj)
@@ -1,18 +1,42 @@
 from __future__ import annotations
 import argparse
 import json
+import mmap
 import os
-from .util import parse_pattern
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterator, List, Tuple
+from .util import hash_json, parse_pattern
 from .solver import ProverConfig, prove_pattern
 from .family import FamilyJob, prove_family
 from .verifier import verify_cert
 
+# Type B certificates proved at k >= 65 carry SAT-leaf x0 values past
+# 2^64, which orjson parses as floats — the recomputed digest then differs
+# and valid certificates fail with "hash mismatch". A 19+ digit run in the
+# raw line conservatively flags such ints (2^63 is already 19 digits).
+_BIG_INT_RE = re.compile(rb"\d{19}")
+
+try:
+    import orjson  # SIMD-accelerated parser; optional
+
+    def _loads(data: bytes):
+        if _BIG_INT_RE.search(data):
+            return json.loads(data)
+        return orjson.loads(data)
+except ImportError:
+    _loads = json.loads
+
 GHOST_REGISTRY = "registry/ghosts.jsonl"
 
+# Verification batch size per worker task; large enough to amortize IPC.
+_VERIFY_BATCH = 256
+
 def cmd_prove(args: argparse.Namespace) -> int:
     pattern = parse_pattern(args.pattern)
     cfg = ProverConfig(k=args.k, max_nodes=args.max_nodes)
-    cert = prove_pattern(pattern, cfg)
+    cert, _ = prove_pattern(pattern, cfg)
     print(json.dumps(cert, indent=2, sort_keys=True))
     return 0
 
@@ -22,18 +46,91 @@ def cmd_prove_family(args: argparse.Namespace) -> int:
     print(json.dumps(summary, indent=2, sort_keys=True))
     return 0
 
+def _iter_cert_lines(path: str) -> Iterator[bytes]:
+    """Yield non-blank JSONL lines as bytes, via mmap to skip buffer copies."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for line in iter(mm.readline, b""):
+                if line.strip():
+                    yield line
+        finally:
+            mm.close()
+
+def _load_verify_cache(cert_path: str) -> frozenset:
+    """Hashes of certificates from this file that already verified OK.
+
+    Stored as one hex digest per line in `<cert>.verified`. Lookups key on
+    the digest recomputed from the record body (never the embedded hash
+    field), so any edit to a record misses the cache — no explicit
+    invalidation needed. Delete the side file to force a full
+    re-verification.
+    """
+    try:
+        with open(cert_path + ".verified", "r", encoding="ascii") as f:
+            return frozenset(line.strip() for line in f if line.strip())
+    except FileNotFoundError:
+        return frozenset()
+
+def _append_verify_cache(cert_path: str, hashes: List[str]) -> None:
+    if hashes:
+        with open(cert_path + ".verified", "a", encoding="ascii") as f:
+            f.write("".join(h + "\n" for h in hashes))
+
+def _verify_line_batch(lines: List[bytes], cache: frozenset = frozenset()) -> List[Tuple[bool, str, str, str, list, str]]:
+    """Parse and verify a batch of raw JSONL lines (process-pool worker).
+
+    Returns (ok, msg, type, reason, pattern, hash) per record — workers parse
+    the bytes themselves so the big tree dicts are never pickled back and
+    forth. The cache key is the digest recomputed from the record body, not
+    the embedded hash field (which a tampered record could keep unchanged);
+    a hit skips the (expensive) tree walk but still proves the body is
+    byte-equivalent to a previously verified record.
+    """
+    out = []
+    for line in lines:
+        cert = _loads(line)
+        body = dict(cert)
+        body.pop("hash", None)
+        h = hash_json(body)
+        if h in cache and cert.get("hash") == h:
+            ok, msg = True, "ok (cached)"
+        else:
+            ok, msg = verify_cert(cert)
+        out.append((ok, msg, cert.get("type"), cert.get("reason", ""), cert.get("pattern", []), h))
+    return out
+
+def _batched(it: Iterator[bytes], n: int) -> Iterator[List[bytes]]:
+    batch: List[bytes] = []
+    for item in it:
+        batch.append(item)
+        if len(batch) >= n:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 def cmd_verify(args: argparse.Namespace) -> int:
     ok_all = True
     count = 0
     ghosts_found = []
-    
-    with open(args.cert, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            cert = json.loads(line)
-            ok, msg = verify_cert(cert)
+
+    cache = frozenset() if args.no_cache else _load_verify_cache(args.cert)
+    new_ok_hashes: List[str] = []
+
+    lines = _iter_cert_lines(args.cert)
+    verify_batch = partial(_verify_line_batch, cache=cache)
+    if args.jobs == 1:
+        results = (r for batch in _batched(lines, _VERIFY_BATCH) for r in verify_batch(batch))
+        ex = None
+    else:
+        ex = ProcessPoolExecutor(max_workers=args.jobs)
+        results = (r for batch_res in ex.map(verify_batch, _batched(lines, _VERIFY_BATCH)) for r in batch_res)
+    try:
+        for ok, msg, ctype, reason, pattern, h in results:
             count += 1
             if not ok:
                 ok_all = False
@@ -41,10 +138,17 @@ def cmd_verify(args: argparse.Namespace) -> int:
             else:
                 if args.verbose:
                     print(f"[OK]   #{count}: {msg}")
-            
+                if h and h not in cache:
+                    new_ok_hashes.append(h)
+
             # Track ghosts (Type B SAT)
-            if cert.get("type") == "B" and "SAT" in cert.get("reason", "") and "UNSAT" not in cert.get("reason", ""):
-                ghosts_found.append(cert.get("pattern", []))
+            if ctype == "B" and "SAT" in reason and "UNSAT" not in reason:
+                ghosts_found.append(pattern)
+    finally:
+        if ex is not None:
+            ex.shutdown()
+    if not args.no_cache:
+        _append_verify_cache(args.cert, new_ok_hashes)
     
     if ok_all:
         print(f"All {count} certificate records verified.")
@@ -87,6 +191,8 @@ def main() -> None:
     p3 = sub.add_parser("verify", help="Verify certificates (jsonl)")
     p3.add_argument("--cert", required=True, help="Path to jsonl with certificates")
     p3.add_argument("--verbose", action="store_true", help="Verbose per-record output")
+    p3.add_argument("--jobs", type=int, default=1, help="Worker processes for verification (1 = in-process)")
+    p3.add_argument("--no-cache", action="store_true", help="Ignore and do not update the .verified hash cache")
     p3.set_defaults(func=cmd_verify)
 
     args = p.parse_args()
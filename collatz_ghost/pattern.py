@@ -2,6 +2,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Iterable, Iterator, Optional
 
+try:
+    import numpy as np  # optional; pure-Python enumeration remains the fallback
+except ImportError:
+    np = None
+
 @dataclass(frozen=True)
 class PatternFamily:
     """Simple family: all sequences of length M with entries in [amin, amax]."""
@@ -9,7 +14,35 @@ class PatternFamily:
     amin: int = 1
     amax: int = 10
 
+def enumerate_bounded_batches(M: int, A: int, amin: int = 1, batch: int = 4096) -> Iterator["np.ndarray"]:
+    """Yield contiguous (batch, M) integer arrays covering the family in the
+    same order as enumerate_family (first position most significant).
+
+    Mixed-radix generation via np.unravel_index amortizes per-pattern
+    allocation; requires numpy.
+    """
+    if np is None:
+        raise RuntimeError("enumerate_bounded_batches requires numpy")
+    if M == 0:
+        yield np.empty((1, 0), dtype=np.int8)
+        return
+    base = A - amin + 1
+    dtype = np.int8 if A < 128 else np.int64
+    total = base ** M
+    shape = (base,) * M
+    for start in range(0, total, batch):
+        idx = np.arange(start, min(start + batch, total))
+        block = np.stack(np.unravel_index(idx, shape), axis=1).astype(dtype)
+        if amin:
+            block += amin
+        yield block
+
 def enumerate_family(fam: PatternFamily) -> Iterator[list[int]]:
+    if np is not None and fam.amax >= fam.amin:
+        for block in enumerate_bounded_batches(fam.M, fam.amax, amin=fam.amin):
+            for row in block:
+                yield row.tolist()
+        return
     from itertools import product
     for tup in product(range(fam.amin, fam.amax + 1), repeat=fam.M):
         yield list(tup)
@@ -1,57 +1,41 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from functools import lru_cache
+from math import gcd
 from typing import Optional, Tuple, Dict, Any, List
 from .affine import rational_cycle_candidate
+from .certs import cert_type_a, cert_type_b
 from .util import pow2, v2_of_int, inv_mod_odd
+from ._sim import simulate_prefix_mod as _simulate_prefix_mod, make_simulator as _make_simulator
+
+@lru_cache(maxsize=None)
+def _pow3(M: int) -> int:
+    # 3^M recurs for every pattern of the same length in a family run
+    return 3 ** M
 
 def _required_residue_exact_v2(a: int) -> Tuple[int, int]:
     """Return (r, m) meaning: exact constraint v2(3x+1)=a implies
     x ≡ r (mod 2^{a+1}), uniquely.
     Reason: v2(3x+1)=a  <=> 3x+1 ≡ 2^a (mod 2^{a+1}).
     So x ≡ (2^a - 1) * 3^{-1} (mod 2^{a+1}).
+    Small a values recur across every pattern in a family run, so they are
+    precomputed once below (the modular inverse costs an extended GCD).
     """
+    if a < len(_RES_TABLE):
+        return _RES_TABLE[a]
     m = a + 1
     mod = 1 << m
     r = ((1 << a) - 1) * inv_mod_odd(3, mod) % mod
     return r, m
 
-def _simulate_prefix_mod(pattern: list[int], x0: int, m: int) -> Tuple[int, int, Optional[Tuple[int,str]]]:
-    """Simulate as far as possible with current precision m (mod 2^m for x0).
-    Returns (xM_mod, m_out, contradiction) where contradiction=(step_index, reason) or None.
-    We stop when we lack enough precision to check the next valuation constraint exactly.
-    """
-    mod = 1 << m
-    x = x0 % mod
-    # x should be odd in the odd-iterate model
-    if x % 2 == 0:
-        return (x, m, (0, "x0 even; odd-iterate required"))
-    for i, a in enumerate(pattern):
-        # Need to check v2(3x+1)=a using only x mod 2^{a+1}
-        need = a + 1
-        if m < need:
-            # can't decide this step yet
-            return (x, m, None)
-        tmod = 1 << need
-        val = (3 * (x % tmod) + 1) % tmod
-        # exact valuation means 3x+1 ≡ 2^a (mod 2^{a+1})
-        if val != (1 << a) % tmod:
-            return (x, m, (i+1, f"valuation mismatch: (3x+1) mod 2^{a+1} != 2^a"))
-        # compute x_next = (3x+1)/2^a mod 2^{m-a}
-        # we know numerator divisible by 2^a under constraint
-        num = (3 * x + 1)
-        # reduce to integer by exact division (safe because constraint enforced mod 2^{a+1}, but
-        # for true integer we only know mod; still, in modular arithmetic this is well-defined for quotient mod 2^{m-a})
-        # We take num modulo 2^m before division to avoid huge ints
-        num_mod = num % (1 << m)
-        q = (num_mod >> a)  # division by 2^a in Z/2^m works by shifting
-        m = m - a
-        if m <= 0:
-            m = 1
-        x = q % (1 << m)
-        # x should be odd (since exact valuation makes q odd)
-        if x % 2 == 0:
-            return (x, m, (i+1, "quotient even; should be odd under exact valuation"))
-    return (x, m, None)
+def _build_res_table(limit: int = 64) -> List[Tuple[int, int]]:
+    table = []
+    for a in range(limit):
+        mod = 1 << (a + 1)
+        table.append((((1 << a) - 1) * inv_mod_odd(3, mod) % mod, a + 1))
+    return table
+
+_RES_TABLE = _build_res_table()
 
 def _closure_contradiction(x_end: int, m_end: int, x0: int, m0: int, target_m: int) -> Optional[str]:
     """Check closure consistency at common precision target_m.
@@ -71,17 +55,26 @@ class ProverConfig:
     min_start_m: int = 8  # starting precision bits for lifting
     require_exact_first_step: bool = True
 
-def prove_pattern(pattern: list[int], cfg: ProverConfig) -> dict:
-    """Return either a type A or type B certificate dict.
+def prove_pattern(pattern: list[int], cfg: ProverConfig) -> Tuple[dict, bytes]:
+    """Return either a type A or type B certificate as (dict, canonical bytes).
+
+    The bytes are the canonical JSON the certificate hash covers; callers
+    writing JSONL can emit them directly instead of re-serializing.
 
     Non-heuristic outputs:
       - Type A: exact rational fixed-point integrality/sign exclusion
       - Type B: DPLL-style UNSAT proof tree for exact valuation constraints mod 2^k
     """
+    # The denominator D = 2^E - 3^M needs only the exponent sum, so compute it
+    # up front from the cached power instead of inside the composition. (It
+    # cannot shortcut the composition entirely: Type A certificates embed B,
+    # which the verifier recomputes and compares.)
+    Esum = sum(pattern)
+    D0 = (1 << Esum) - _pow3(len(pattern))
+
     # --- Type A: exact rational candidate for cycle closure ---
-    B0, D0 = rational_cycle_candidate(pattern)
+    B0, _D0 = rational_cycle_candidate(pattern)
     if D0 == 0:
-        from .certs import cert_type_a
         return cert_type_a(pattern, B0, D0, "D=0 (degenerate); no integer cycle")
 
     # Normalize a working copy for arithmetic checks, but KEEP originals for the certificate.
@@ -89,33 +82,40 @@ def prove_pattern(pattern: list[int], cfg: ProverConfig) -> dict:
     if D < 0:
         B, D = -B, -D
 
-    from math import gcd
     g = gcd(abs(B), D)
     Bred, Dred = B // g, D // g
 
     if Dred != 1:
-        from .certs import cert_type_a
         return cert_type_a(pattern, B0, D0, "non-integer rational fixed point (D does not divide B)")
     if Bred <= 0:
-        from .certs import cert_type_a
         return cert_type_a(pattern, B0, D0, "non-positive integer fixed point")
 
+    # Fast pre-check: a positive integer fixed point (e.g. x=1 for the
+    # all-twos pattern) is a known SAT ghost. One straight-line simulation at
+    # full precision replaces the 2^(k-m_start)-node tree in that case.
+    x0_fix = Bred % (1 << cfg.k)
+    x_end, m_end, _steps, contra = _simulate_prefix_mod(pattern, x0_fix, cfg.k)
+    if contra is None and _closure_contradiction(x_end, m_end, x0_fix, cfg.k, cfg.k) is None:
+        tree = {"leaf": True, "sat": True, "m": cfg.k, "x0_mod_2^m": x0_fix}
+        return cert_type_b(pattern, cfg.k, tree,
+                           "SAT: exact integer fixed point (ghost/2-adic solution exists); Type B cannot exclude")
+
     # --- Type B: exact 2-adic valuation constraints modulo 2^k ---
-    tree, reason = _prove_unsat_valuation(pattern, cfg)
-    from .certs import cert_type_b
-    return cert_type_b(pattern, cfg.k, tree, reason)
+    tree, node_table, reason = _prove_unsat_valuation(pattern, cfg)
+    return cert_type_b(pattern, cfg.k, tree, reason, nodes=node_table)
 
 
-def _prove_unsat_valuation(pattern: list[int], cfg: ProverConfig) -> Tuple[dict, str]:
-    """Build a DPLL-style proof tree showing no x0 modulo 2^k works."""
+def _prove_unsat_valuation(pattern: list[int], cfg: ProverConfig) -> Tuple[dict, list, str]:
+    """Build a DPLL-style proof tree (plus shared-leaf table) showing no x0
+    modulo 2^k works. Returns (tree, node_table, reason)."""
     k = cfg.k
     # initial constraint from first step valuation can pin x0 mod 2^{a1+1}
     if not pattern:
-        return {"leaf": True, "contradiction": "empty pattern not supported"}, "empty pattern"
+        return {"leaf": True, "contradiction": "empty pattern not supported"}, [], "empty pattern"
     a1 = pattern[0]
     r0, m0 = _required_residue_exact_v2(a1)
     if cfg.require_exact_first_step and k < m0:
-        return {"leaf": True, "contradiction": "k < a1+1; increase k"}, "insufficient k for first-step valuation"
+        return {"leaf": True, "contradiction": "k < a1+1; increase k"}, [], "insufficient k for first-step valuation"
     # start at precision m_start = max(min_start_m, m0, min(k, something))
     m_start = max(cfg.min_start_m, m0)
     if m_start > k:
@@ -124,25 +124,43 @@ def _prove_unsat_valuation(pattern: list[int], cfg: ProverConfig) -> Tuple[dict,
     x0_base = r0 % (1 << m0)
     # choose representative modulo 2^{m_start} that matches base
     x0_rep = x0_base  # lower bits
-    # proof tree over residues mod 2^m, branching one bit at a time until k
+    # proof tree over residues mod 2^m, branching one bit at a time until k.
+    # Explicit DFS stack instead of recursion: avoids frame overhead at
+    # depth k - m_start. Each node simulates from step 0: the parent only
+    # knows its continuation mod 2^{m_end}, so a child at precision m+1
+    # cannot soundly reuse it (bit m_end of the true continuation is
+    # unknown and would swap the two children's trajectories).
     nodes = 0
+    simulate = _make_simulator(pattern, k)
 
-    def recurse(m: int, x0: int) -> dict:
-        nonlocal nodes
+    # Frames: (m, x0, out) where out is the parent's children list
+    # (pre-order append). Nodes are packed tuples/lists during the build
+    # (see _tree_to_dict for the shapes); the dict form with string keys is
+    # only materialized once at emit time, cutting per-node memory
+    # several-fold for large trees.
+    root_holder: List = []
+    sat_found = False
+    stack: List[tuple] = [(m_start, x0_rep, root_holder)]
+    while stack:
+        m, x0, out = stack.pop()
         nodes += 1
         if nodes > cfg.max_nodes:
-            return {"leaf": True, "contradiction": "max_nodes exceeded (increase cap or reduce k)"}
+            out.append(("maxnodes",))
+            continue
         # Enforce base congruence mod 2^{m0}
         if (x0 % (1 << m0)) != x0_base:
-            return {"leaf": True, "contradiction": f"violates base residue mod 2^{m0}"}
+            out.append(("base",))
+            continue
         # Must be odd
         if x0 % 2 == 0:
-            return {"leaf": True, "contradiction": "x0 even"}
+            out.append(("even",))
+            continue
         # simulate with precision m
-        x_end, m_end, contra = _simulate_prefix_mod(pattern, x0, m)
+        x_end, m_end, _steps, contra = simulate(x0, m)
         if contra is not None:
             step, msg = contra
-            return {"leaf": True, "contradiction": msg, "at_step": step, "m": m}
+            out.append(("contra", msg, step, m))
+            continue
         # if we completed all steps, check closure at precision m (or k?)
         # Note: _simulate_prefix_mod returns x in modulus 2^{m_end} after full loop if no early stop.
         # But if m_end < 1 shouldn't happen.
@@ -151,27 +169,89 @@ def _prove_unsat_valuation(pattern: list[int], cfg: ProverConfig) -> Tuple[dict,
             # We only know x_end mod 2^{m_end}, x0 mod 2^m. Compare at min(m_end,m)
             cl = _closure_contradiction(x_end, m_end, x0, m, m)
             if cl is not None:
-                return {"leaf": True, "contradiction": cl, "m": m, "m_end": m_end}
+                out.append(("closure", cl, m, m_end))
+                continue
         # If m == k and still no contradiction detected, then SAT at this leaf
         if m >= k:
-            return {"leaf": True, "sat": True, "m": m, "x0_mod_2^m": int(x0)}
+            out.append(("sat", m, int(x0)))
+            sat_found = True
+            continue
         # Otherwise, branch by adding next bit
         # To preserve base residue, if m < m0 then branching must match, but we already start m>=m0.
-        child0 = recurse(m + 1, x0)              # bit 0
-        child1 = recurse(m + 1, x0 + (1 << m))   # set new bit to 1
-        # UNSAT if both children unsat (no 'sat':True)
-        return {"m": m, "x0_mod_2^m": int(x0), "children": [child0, child1]}
-
-    tree = recurse(m_start, x0_rep)
-    # Determine satisfiable?
-    def has_sat(t: dict) -> bool:
-        if t.get("sat") is True:
-            return True
-        for c in t.get("children", []):
-            if has_sat(c):
-                return True
-        return False
-    if has_sat(tree):
-        return tree, "valuation constraints SAT at target k (ghost/2-adic solution exists); Type B cannot exclude"
-    return tree, f"UNSAT: no solution modulo 2^{k} satisfying exact valuation constraints and closure"
+        children: List = []
+        out.append([m, int(x0), children])
+        # Push bit-1 child first so the bit-0 child is processed first
+        # (preserves the recursive pre-order and [child0, child1] layout).
+        stack.append((m + 1, x0 + (1 << m), children))
+        stack.append((m + 1, x0, children))
+
+    tree, node_table = _emit_tree(root_holder[0], m0)
+    # UNSAT if both children unsat (no 'sat':True)
+    # SAT was detected while building: no second pass over the tree needed.
+    if sat_found:
+        return tree, node_table, "valuation constraints SAT at target k (ghost/2-adic solution exists); Type B cannot exclude"
+    return tree, node_table, f"UNSAT: no solution modulo 2^{k} satisfying exact valuation constraints and closure"
+
+
+def _emit_tree(root, m0: int) -> Tuple[dict, list]:
+    """Expand a packed tree, hash-consing repeated leaves into a node table.
+
+    Identical contradiction leaves (same message/step/precision) recur across
+    many branches; each distinct repeated leaf is emitted once in the table
+    and referenced as {"ref": id} in the tree. Internal and SAT nodes carry
+    their unique x0 residue, so they can never repeat and stay inline.
+    Returns (tree_dict, node_table).
+    """
+    from collections import Counter
+    counts: Counter = Counter()
+    scan = [root]
+    while scan:
+        node = scan.pop()
+        if isinstance(node, list):
+            scan.extend(node[2])
+        elif node[0] != "sat":
+            counts[node] += 1
+    table: list = []
+    index: dict = {}
+
+    def emit(node) -> dict:
+        if not isinstance(node, list) and node[0] != "sat" and counts[node] > 1:
+            ref = index.get(node)
+            if ref is None:
+                ref = len(table)
+                index[node] = ref
+                table.append(_tree_to_dict(node, m0))
+            return {"ref": ref}
+        return _tree_to_dict(node, m0, emit)
+
+    return emit(root), table
+
+
+def _tree_to_dict(node, m0: int, child_emit=None) -> dict:
+    """Expand a packed build node into the JSON certificate dict form.
+
+    Packed shapes: internal nodes are [m, x0, children]; leaves are tuples
+    tagged ("maxnodes",), ("base",), ("even",), ("contra", msg, step, m),
+    ("closure", msg, m, m_end) or ("sat", m, x0). Recursion depth is the
+    tree depth (at most k - m_start + 1), not the node count. child_emit
+    (default: plain expansion) lets _emit_tree intercept children for
+    hash-consing.
+    """
+    if child_emit is None:
+        child_emit = lambda c: _tree_to_dict(c, m0)
+    if isinstance(node, list):
+        m, x0, children = node
+        return {"m": m, "x0_mod_2^m": x0, "children": [child_emit(c) for c in children]}
+    tag = node[0]
+    if tag == "sat":
+        return {"leaf": True, "sat": True, "m": node[1], "x0_mod_2^m": node[2]}
+    if tag == "contra":
+        return {"leaf": True, "contradiction": node[1], "at_step": node[2], "m": node[3]}
+    if tag == "closure":
+        return {"leaf": True, "contradiction": node[1], "m": node[2], "m_end": node[3]}
+    if tag == "base":
+        return {"leaf": True, "contradiction": f"violates base residue mod 2^{m0}"}
+    if tag == "even":
+        return {"leaf": True, "contradiction": "x0 even"}
+    return {"leaf": True, "contradiction": "max_nodes exceeded (increase cap or reduce k)"}
 
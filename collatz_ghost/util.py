@@ -1,9 +1,20 @@
 from __future__ import annotations
 import hashlib
 import json
+import os
 from dataclasses import dataclass
 from typing import Any, Dict
 
+try:
+    import blake3  # SIMD-accelerated; optional
+except ImportError:
+    blake3 = None
+
+# Certificates hash with SHA-256 by default so they verify anywhere; set
+# COLLATZ_GHOST_HASH=blake3 (requires the blake3 package) on both the proving
+# and verifying side to opt into the faster digest.
+USE_BLAKE3 = blake3 is not None and os.environ.get("COLLATZ_GHOST_HASH", "") == "blake3"
+
 def sha256_bytes(b: bytes) -> str:
     return hashlib.sha256(b).hexdigest()
 
@@ -11,6 +22,21 @@ def sha256_json(obj: Any) -> str:
     data = json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
     return sha256_bytes(data)
 
+def hash_json(obj: Any) -> str:
+    """Canonical-JSON digest using the configured hash (sha256 or blake3)."""
+    data = json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    if USE_BLAKE3:
+        return blake3.blake3(data).hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+def hash_and_canonical(obj: Any) -> tuple[str, bytes]:
+    """Like hash_json, but also return the canonical bytes the digest was
+    computed from, so callers can reuse them instead of re-serializing."""
+    data = json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    if USE_BLAKE3:
+        return blake3.blake3(data).hexdigest(), data
+    return hashlib.sha256(data).hexdigest(), data
+
 def pow2(k: int) -> int:
     return 1 << k
 
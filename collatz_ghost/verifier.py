@@ -4,14 +4,15 @@ from typing import Any, Dict, Optional, Tuple
 import json
 from math import gcd
 from .affine import rational_cycle_candidate
-from .util import sha256_json, inv_mod_odd
+from .util import hash_json, inv_mod_odd
+from ._sim import make_simulator, simulate_prefix_mod
 
 def verify_cert(cert: dict) -> Tuple[bool, str]:
     # hash integrity
     h = cert.get("hash")
     cert_wo_hash = dict(cert)
     cert_wo_hash.pop("hash", None)
-    if h != sha256_json(cert_wo_hash):
+    if h != hash_json(cert_wo_hash):
         return False, "hash mismatch"
     t = cert.get("type")
     if t == "A":
@@ -19,9 +20,20 @@ def verify_cert(cert: dict) -> Tuple[bool, str]:
     if t == "B":
         return _verify_b(cert)
     if t == "BATCH":
-        return True, "batch header hash OK (does not rehash members here)"
+        return _verify_batch(cert)
     return False, f"unknown cert type: {t}"
 
+def _verify_batch(cert: dict) -> Tuple[bool, str]:
+    # An optional "inclusion" object {leaf, index, path} lets a member be
+    # checked against the Merkle root in O(log N) without rehashing the batch.
+    proof = cert.get("inclusion")
+    if proof is not None:
+        from .certs import merkle_verify_path
+        if not merkle_verify_path(proof["leaf"], int(proof["index"]), proof["path"], cert.get("root", "")):
+            return False, "inclusion path does not reproduce batch root"
+        return True, "batch header hash OK; inclusion path verified"
+    return True, "batch header hash OK (does not rehash members here)"
+
 def _verify_a(cert: dict) -> Tuple[bool, str]:
     pattern = cert["pattern"]
     B = int(cert["B"])
@@ -57,74 +69,85 @@ def _verify_a(cert: dict) -> Tuple[bool, str]:
         return True, "non-positive confirmed (generic)"
     return False, "Type A certificate does not demonstrate exclusion"
 
-def _simulate_prefix_mod(pattern: list[int], x0: int, m: int):
-    # duplicated minimal logic from solver (verifier is independent-ish but must be consistent)
-    mod = 1 << m
-    x = x0 % mod
-    if x % 2 == 0:
-        return (x, m, (0, "x0 even"))
-    for i, a in enumerate(pattern):
-        need = a + 1
-        if m < need:
-            return (x, m, None)
-        tmod = 1 << need
-        val = (3 * (x % tmod) + 1) % tmod
-        if val != (1 << a) % tmod:
-            return (x, m, (i+1, "valuation mismatch"))
-        num_mod = (3 * x + 1) % (1 << m)
-        q = (num_mod >> a)
-        m = m - a
-        if m <= 0:
-            m = 1
-        x = q % (1 << m)
-        if x % 2 == 0:
-            return (x, m, (i+1, "quotient even"))
-    return (x, m, None)
+# The simulation loop is shared with the solver via _sim (single source of
+# truth — the verifier previously carried a hand-synced duplicate). Leaf
+# checks only inspect whether a contradiction exists, not its message, so
+# sharing cannot change any verdict.
 
 def _closure_mismatch(x_end: int, m_end: int, x0: int, m0: int, target_m: int) -> bool:
     m = min(m_end, m0, target_m)
     mod = 1 << m
     return (x_end % mod) != (x0 % mod)
 
-def _verify_tree(pattern: list[int], k: int, tree: dict) -> Tuple[bool, str, bool]:
-    """Return (ok, msg, has_sat)"""
-    if tree.get("leaf") is True:
-        if tree.get("sat") is True:
-            # validate SAT leaf actually satisfies constraints up to m
-            m = int(tree["m"])
-            x0 = int(tree["x0_mod_2^m"])
-            x_end, m_end, contra = _simulate_prefix_mod(pattern, x0, m)
-            if contra is not None:
-                return False, "sat leaf contradicts simulation", True
-            if _closure_mismatch(x_end, m_end, x0, m, m):
-                return False, "sat leaf contradicts closure", True
-            return True, "sat leaf valid", True
-        # contradiction leaf: check that contradiction is real at claimed m/step if present
-        m = int(tree.get("m", 0)) or None
-        x0 = int(tree.get("x0_mod_2^m", 0)) if "x0_mod_2^m" in tree else None
-        if m is not None and x0 is not None and m > 0:
-            x_end, m_end, contra = _simulate_prefix_mod(pattern, x0, m)
-            # Either a direct contradiction or closure mismatch is acceptable
-            if contra is None and not _closure_mismatch(x_end, m_end, x0, m, m):
-                return False, "contradiction leaf not justified by simulation/closure", False
-        return True, "contradiction leaf accepted", False
-    # internal node: must have two children
-    ch = tree.get("children")
-    if not isinstance(ch, list) or len(ch) != 2:
-        return False, "internal node missing 2 children", False
-    ok0, msg0, sat0 = _verify_tree(pattern, k, ch[0])
-    if not ok0:
-        return False, f"child0 invalid: {msg0}", sat0
-    ok1, msg1, sat1 = _verify_tree(pattern, k, ch[1])
-    if not ok1:
-        return False, f"child1 invalid: {msg1}", sat1
-    return True, "node OK", (sat0 or sat1)
+def _verify_leaf(pattern: list[int], k: int, leaf: dict, simulate) -> Tuple[bool, str, bool]:
+    if leaf.get("sat") is True:
+        # validate SAT leaf actually satisfies constraints up to m
+        m = int(leaf["m"])
+        x0 = int(leaf["x0_mod_2^m"])
+        x_end, m_end, _steps, contra = simulate(x0, m)
+        if contra is not None:
+            return False, "sat leaf contradicts simulation", True
+        if _closure_mismatch(x_end, m_end, x0, m, m):
+            return False, "sat leaf contradicts closure", True
+        return True, "sat leaf valid", True
+    # contradiction leaf: check that contradiction is real at claimed m/step if present
+    m = int(leaf.get("m", 0)) or None
+    x0 = int(leaf.get("x0_mod_2^m", 0)) if "x0_mod_2^m" in leaf else None
+    if m is not None and x0 is not None and m > 0:
+        x_end, m_end, _steps, contra = simulate(x0, m)
+        # Either a direct contradiction or closure mismatch is acceptable
+        if contra is None and not _closure_mismatch(x_end, m_end, x0, m, m):
+            return False, "contradiction leaf not justified by simulation/closure", False
+    return True, "contradiction leaf accepted", False
+
+def _nest_msg(msg: str, path: Tuple[int, ...]) -> str:
+    for i in reversed(path):
+        msg = f"child{i} invalid: {msg}"
+    return msg
+
+def _verify_tree(pattern: list[int], k: int, tree: dict, nodes: Optional[list] = None) -> Tuple[bool, str, bool]:
+    """Return (ok, msg, has_sat).
+
+    Iterative DFS: proof trees can be millions of nodes deep-wide, which
+    blows the recursion limit and pays a frame per node. Verification stops
+    at the first invalid node (same node the recursive version reported).
+    `nodes` is the certificate's optional shared-leaf table; {"ref": id}
+    entries in the tree resolve into it.
+    """
+    has_sat = False
+    root_msg = "node OK"
+    simulate = make_simulator(pattern, k)
+    stack = [(tree, ())]
+    while stack:
+        node, path = stack.pop()
+        if "ref" in node:
+            ref = node["ref"]
+            if not isinstance(ref, int) or nodes is None or not (0 <= ref < len(nodes)):
+                return False, _nest_msg("unresolvable node ref", path), False
+            node = nodes[ref]
+        if node.get("leaf") is True:
+            ok, msg, sat = _verify_leaf(pattern, k, node, simulate)
+            if sat:
+                has_sat = True
+            if not ok:
+                return False, _nest_msg(msg, path), sat
+            if not path:
+                root_msg = msg
+            continue
+        # internal node: must have two children
+        ch = node.get("children")
+        if not isinstance(ch, list) or len(ch) != 2:
+            return False, _nest_msg("internal node missing 2 children", path), False
+        # push child1 first so child0 is checked first (recursive order)
+        stack.append((ch[1], path + (1,)))
+        stack.append((ch[0], path + (0,)))
+    return True, root_msg, has_sat
 
 def _verify_b(cert: dict) -> Tuple[bool, str]:
     pattern = cert["pattern"]
     k = int(cert["k"])
     tree = cert["tree"]
-    ok, msg, has_sat = _verify_tree(pattern, k, tree)
+    ok, msg, has_sat = _verify_tree(pattern, k, tree, cert.get("nodes"))
     if not ok:
         return False, msg
     reason = cert.get("reason", "")
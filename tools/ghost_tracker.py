@@ -31,18 +31,111 @@ Usage:
 import argparse
 import json
 import os
+import re
+import sys
 from collections import defaultdict
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Set, Tuple
 
+# Registry records can hold x0 candidates >= 2^64 (any k >= 65 run), which
+# orjson refuses to serialize and quietly parses back as floats. Route
+# those records through stdlib json; a 19-digit run in the raw bytes is
+# the conservative tell for a possibly out-of-range int.
+_BIG_INT_RE = re.compile(rb"\d{19}")
+
+try:
+    import orjson
+    def _loads(data):
+        raw = data if isinstance(data, bytes) else data.encode("utf-8")
+        if _BIG_INT_RE.search(raw):
+            return json.loads(data)
+        return orjson.loads(data)
+    def _dumps(obj) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
+except ImportError:
+    _loads = json.loads
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, sort_keys=True).encode("utf-8")
+
 # Default paths
 GHOST_REGISTRY = "registry/ghosts.jsonl"
 GHOST_ANALYSIS = "registry/ghost_analysis.json"
 
+# SQLite mirror of the registry: the JSONL stays the canonical append-only
+# store (run_atlas and external scripts keep writing it), but the mirror
+# gives O(1) dedup via INSERT OR IGNORE and indexed per-pattern queries.
+# It is rebuilt from the JSONL whenever it is missing or stale (mtime).
+_DB_SCHEMA = """CREATE TABLE IF NOT EXISTS ghosts(
+    pattern_str TEXT NOT NULL,
+    k INTEGER NOT NULL,
+    x0 TEXT,
+    is_trivial INTEGER NOT NULL,
+    source TEXT,
+    found_at TEXT,
+    PRIMARY KEY (pattern_str, k)
+)"""
+
+
+def _ghost_db_path(registry_path: str) -> str:
+    return os.path.splitext(registry_path)[0] + ".sqlite"
+
+
+def _open_ghost_db(registry_path: str = GHOST_REGISTRY):
+    import sqlite3
+    db_path = _ghost_db_path(registry_path)
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute(_DB_SCHEMA)
+    return conn
+
+
+def _db_insert_records(conn, records) -> None:
+    conn.executemany(
+        "INSERT OR IGNORE INTO ghosts VALUES(?,?,?,?,?,?)",
+        (
+            (
+                r["pattern_str"],
+                r["k"],
+                None if r.get("x0_candidate") is None else str(r["x0_candidate"]),
+                int(bool(r.get("is_trivial"))),
+                r.get("source_atlas"),
+                r.get("first_seen") or r.get("found_at"),
+            )
+            for r in records
+        ),
+    )
+    conn.commit()
+
+
+def _ghost_db_fresh(registry_path: str = GHOST_REGISTRY) -> bool:
+    db_path = _ghost_db_path(registry_path)
+    return (
+        os.path.exists(db_path)
+        and os.path.exists(registry_path)
+        and os.path.getmtime(db_path) >= os.path.getmtime(registry_path)
+    )
+
+
+def _sync_ghost_db(registry_path: str = GHOST_REGISTRY):
+    """Open the mirror, rebuilding it from the JSONL if stale. Returns conn.
+
+    The freshness probe must run before _open_ghost_db, which creates the
+    database file (and thereby a brand-new mtime) as a side effect.
+    """
+    stale = not _ghost_db_fresh(registry_path)
+    conn = _open_ghost_db(registry_path)
+    if stale and os.path.exists(registry_path):
+        _db_insert_records(conn, (_loads(line) for line in _iter_jsonl_lines(registry_path)))
+    return conn
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class GhostRecord:
     """A single ghost observation."""
     pattern: List[int]
@@ -56,8 +149,24 @@ class GhostRecord:
     notes: str = ""
 
 
+_GHOST_FIELDS = tuple(f.name for f in fields(GhostRecord))
+
+
+def _ghost_dict(ghost: GhostRecord) -> Dict[str, Any]:
+    # attribute walk over the fixed field tuple; asdict() deep-copies
+    return {name: getattr(ghost, name) for name in _GHOST_FIELDS}
+
+
+# Patterns repeat across k-ladder atlases; cache the join per distinct tuple.
+_pat_str_cache: Dict[tuple, str] = {}
+
+
 def pattern_to_str(pat: List[int]) -> str:
-    return ",".join(map(str, pat))
+    key = tuple(pat)
+    s = _pat_str_cache.get(key)
+    if s is None:
+        s = _pat_str_cache[key] = ",".join(map(str, pat))
+    return s
 
 
 def str_to_pattern(s: str) -> List[int]:
@@ -69,17 +178,48 @@ def is_trivial_pattern(pat: List[int]) -> bool:
     return all(x == 2 for x in pat)
 
 
+@lru_cache(maxsize=None)
+def is_trivial_pattern_str(pat_str: str) -> bool:
+    """String-form trivial check: avoids the str->int round trip, and
+    patterns repeat heavily so results are memoized."""
+    return set(pat_str.split(",")) == {"2"}
+
+
 def extract_x0_from_tree(tree: dict) -> Optional[int]:
-    """Try to extract the SAT x0 value from a proof tree."""
-    if tree.get("sat") is True:
-        return tree.get("x0_mod_2^m")
-    for child in tree.get("children", []):
-        result = extract_x0_from_tree(child)
-        if result is not None:
-            return result
+    """Try to extract the SAT x0 value from a proof tree.
+
+    Explicit-stack DFS (same as run_atlas.py): avoids recursion-limit blowups
+    on deep trees while keeping the left-to-right first-match order.
+    """
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node.get("sat") is True:
+            return node.get("x0_mod_2^m")
+        children = node.get("children")
+        if children:
+            stack.extend(reversed(children))
     return None
 
 
+def _iter_jsonl_lines(path: str):
+    """Yield non-blank JSONL lines as bytes, reading in 1 MiB blocks
+    (same streaming loop as run_atlas.py; avoids per-line str decoding)."""
+    with open(path, "rb") as f:
+        tail = b""
+        while True:
+            block = f.read(1 << 20)
+            if not block:
+                break
+            lines = (tail + block).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield line
+        if tail.strip():
+            yield tail
+
+
 def is_type_b_sat(rec: Dict[str, Any]) -> bool:
     reason = rec.get("reason", "")
     if "UNSAT" in reason:
@@ -93,36 +233,38 @@ def extract_ghosts_from_atlas(atlas_path: str) -> List[GhostRecord]:
     """Extract all ghost (SAT) patterns from an atlas file."""
     ghosts = []
     batch_info = None
-    
-    with open(atlas_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            rec = json.loads(line)
-            
-            if rec.get("type") == "BATCH":
-                batch_info = rec
-                continue
-            
-            if rec.get("type") == "B" and is_type_b_sat(rec):
-                pat = rec.get("pattern", [])
-                k = rec.get("k", 0)
-                tree = rec.get("tree", {})
-                x0 = extract_x0_from_tree(tree)
-                
-                ghost = GhostRecord(
-                    pattern=pat,
-                    pattern_str=pattern_to_str(pat),
-                    M=len(pat),
-                    k=k,
-                    source_atlas=atlas_path,
-                    first_seen=datetime.now().isoformat(),
-                    x0_candidate=x0,
-                    is_trivial=is_trivial_pattern(pat),
-                )
-                ghosts.append(ghost)
-    
+    # One timestamp per extraction pass (see run_atlas.iter_ghosts).
+    now_iso = datetime.now().isoformat()
+
+    for line in _iter_jsonl_lines(atlas_path):
+        # Bytes-level prefilter: Type-A records dominate most atlases and
+        # are never ghosts, so skip their parse outright.
+        if b'"type":"A"' in line or b'"type": "A"' in line:
+            continue
+        rec = _loads(line)
+
+        if rec.get("type") == "BATCH":
+            batch_info = rec
+            continue
+
+        if rec.get("type") == "B" and is_type_b_sat(rec):
+            pat = rec.get("pattern", [])
+            k = rec.get("k", 0)
+            tree = rec.get("tree", {})
+            x0 = extract_x0_from_tree(tree)
+
+            ghost = GhostRecord(
+                pattern=pat,
+                pattern_str=pattern_to_str(pat),
+                M=len(pat),
+                k=k,
+                source_atlas=atlas_path,
+                first_seen=now_iso,
+                x0_candidate=x0,
+                is_trivial=is_trivial_pattern(pat),
+            )
+            ghosts.append(ghost)
+
     return ghosts
 
 
@@ -143,15 +285,49 @@ def load_ghost_registry(path: str = GHOST_REGISTRY) -> List[Dict[str, Any]]:
 
 def save_ghost_to_registry(ghost: GhostRecord, path: str = GHOST_REGISTRY):
     """Append a ghost record to the registry."""
+    save_ghosts_to_registry([ghost], path)
+
+
+def save_ghosts_to_registry(ghosts: List[GhostRecord], path: str = GHOST_REGISTRY):
+    """Append ghost records to the registry in one buffered write."""
+    if not ghosts:
+        return
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(asdict(ghost), sort_keys=True) + "\n")
+    buf = bytearray()
+    dicts = []
+    for ghost in ghosts:
+        d = _ghost_dict(ghost)
+        dicts.append(d)
+        buf += _dumps(d)
+        buf += b"\n"
+    with open(path, "ab") as f:
+        f.write(buf)
+    # Write-through to the SQLite mirror; INSERT OR IGNORE makes the dedup
+    # constraint-enforced and keeps the mirror's mtime >= the JSONL's.
+    conn = _sync_ghost_db(path)
+    _db_insert_records(conn, dicts)
+    conn.close()
 
 
 def get_known_ghost_keys(path: str = GHOST_REGISTRY) -> Set[Tuple[str, int]]:
-    """Get set of (pattern_str, k) pairs already in registry."""
-    records = load_ghost_registry(path)
-    return {(r["pattern_str"], r["k"]) for r in records}
+    """Get set of (pattern_str, k) pairs already in registry.
+
+    Served from the SQLite mirror when it is current; otherwise streams the
+    JSONL directly, keeping only the two key fields.
+    """
+    if _ghost_db_fresh(path):
+        conn = _open_ghost_db(path)
+        try:
+            return set(conn.execute("SELECT pattern_str, k FROM ghosts"))
+        finally:
+            conn.close()
+    if not os.path.exists(path):
+        return set()
+    keys = set()
+    for line in _iter_jsonl_lines(path):
+        r = _loads(line)
+        keys.add((r["pattern_str"], r["k"]))
+    return keys
 
 
 # ============================================================================
@@ -173,14 +349,20 @@ def cmd_extract(args):
         print("No ghosts (SAT patterns) found in this atlas.")
         return 0
     
-    # Check for duplicates
-    known = get_known_ghost_keys()
-    new_ghosts = [g for g in ghosts if (g.pattern_str, g.k) not in known]
+    # Check for duplicates, both against the registry and within this batch
+    # (an atlas re-run can repeat a (pattern, k) observation).
+    seen = get_known_ghost_keys()
+    new_ghosts = []
+    for g in ghosts:
+        key = (g.pattern_str, g.k)
+        if key not in seen:
+            seen.add(key)
+            new_ghosts.append(g)
     
     print(f"Found {len(ghosts)} ghost(s), {len(new_ghosts)} new")
     
+    save_ghosts_to_registry(new_ghosts)
     for ghost in new_ghosts:
-        save_ghost_to_registry(ghost)
         trivial_tag = " [TRIVIAL]" if ghost.is_trivial else ""
         print(f"  + [{ghost.pattern_str}] k={ghost.k} x0={ghost.x0_candidate}{trivial_tag}")
     
@@ -199,26 +381,34 @@ def cmd_list(args):
         print("Run: python tools/ghost_tracker.py extract <atlas.jsonl>")
         return 0
     
-    # Group by pattern
-    by_pattern = defaultdict(list)
+    # Group by pattern in one pass: k-set plus the first observation (the
+    # only record the listing actually reads fields from).
+    pattern_ks: Dict[str, Set[int]] = defaultdict(set)
+    first_obs: Dict[str, Dict[str, Any]] = {}
     for r in records:
-        by_pattern[r["pattern_str"]].append(r)
-    
-    print(f"\n=== Ghost Registry ({len(records)} observations, {len(by_pattern)} unique patterns) ===\n")
-    
+        pat_str = r["pattern_str"]
+        pattern_ks[pat_str].add(r["k"])
+        if pat_str not in first_obs:
+            first_obs[pat_str] = r
+
+    print(f"\n=== Ghost Registry ({len(records)} observations, {len(pattern_ks)} unique patterns) ===\n")
+
+    # Pattern length without re-splitting the string per comparison:
+    # comma count + 1 allocates nothing.
+    pattern_m = {p: p.count(",") + 1 for p in pattern_ks}
+
     # Sort by pattern length, then pattern string
-    for pat_str in sorted(by_pattern.keys(), key=lambda s: (len(s.split(",")), s)):
-        observations = by_pattern[pat_str]
-        k_values = sorted(set(r["k"] for r in observations))
-        is_trivial = observations[0].get("is_trivial", False)
-        trivial_tag = " [TRIVIAL - x=1 cycle]" if is_trivial else ""
-        
+    for pat_str in sorted(pattern_ks.keys(), key=lambda s: (pattern_m[s], s)):
+        obs = first_obs[pat_str]
+        k_values = sorted(pattern_ks[pat_str])
+        trivial_tag = " [TRIVIAL - x=1 cycle]" if obs.get("is_trivial", False) else ""
+
         print(f"Pattern: [{pat_str}]{trivial_tag}")
-        print(f"  Length: M={len(pat_str.split(','))}")
+        print(f"  Length: M={pattern_m[pat_str]}")
         print(f"  Observed at k: {k_values}")
-        print(f"  First seen: {observations[0].get('first_seen', 'unknown')}")
-        if observations[0].get("x0_candidate"):
-            print(f"  x0 candidate (mod 2^k): {observations[0]['x0_candidate']}")
+        print(f"  First seen: {obs.get('first_seen', 'unknown')}")
+        if obs.get("x0_candidate"):
+            print(f"  x0 candidate (mod 2^k): {obs['x0_candidate']}")
         print()
     
     return 0
@@ -227,28 +417,33 @@ def cmd_list(args):
 def cmd_stability(args):
     """Analyze stability of a specific pattern across k values."""
     pattern_str = args.pattern
-    records = load_ghost_registry()
-    
-    # Find all observations of this pattern
-    observations = [r for r in records if r["pattern_str"] == pattern_str]
-    
-    if not observations:
+
+    if os.path.exists(GHOST_REGISTRY):
+        # Indexed query against the SQLite mirror: one row per (pattern, k),
+        # already ordered, no full-registry scan.
+        conn = _sync_ghost_db()
+        rows = conn.execute(
+            "SELECT k, x0, source, is_trivial FROM ghosts WHERE pattern_str=? ORDER BY k",
+            (pattern_str,),
+        ).fetchall()
+        conn.close()
+    else:
+        rows = []
+
+    if not rows:
         print(f"Pattern [{pattern_str}] not found in ghost registry.")
         print("It may have been excluded by Type A or Type B UNSAT.")
         return 0
-    
-    k_values = sorted(set(r["k"] for r in observations))
-    
+
+    k_values = [k for k, _, _, _ in rows]
+
     print(f"\n=== Ghost Stability Analysis: [{pattern_str}] ===\n")
-    print(f"Pattern length: M={len(pattern_str.split(','))}")
-    print(f"Is trivial (x=1 cycle): {observations[0].get('is_trivial', False)}")
+    print(f"Pattern length: M={pattern_str.count(',') + 1}")
+    print(f"Is trivial (x=1 cycle): {bool(rows[0][3])}")
     print(f"\nObserved as SAT at precision levels:")
-    
-    for k in k_values:
-        obs = [r for r in observations if r["k"] == k]
-        x0 = obs[0].get("x0_candidate")
-        source = obs[0].get("source_atlas", "unknown")
-        print(f"  k={k:3d}: SAT (x0 mod 2^{k} = {x0}) from {os.path.basename(source)}")
+
+    for k, x0, source, _ in rows:
+        print(f"  k={k:3d}: SAT (x0 mod 2^{k} = {x0}) from {os.path.basename(source or 'unknown')}")
     
     if len(k_values) >= 2:
         print(f"\nStability: Ghost persists across {len(k_values)} precision levels")
@@ -262,11 +457,19 @@ def cmd_ladder(args):
     atlas_a = args.atlas_a
     atlas_b = args.atlas_b
     
-    ghosts_a = extract_ghosts_from_atlas(atlas_a)
-    ghosts_b = extract_ghosts_from_atlas(atlas_b)
-    
-    set_a = {g.pattern_str for g in ghosts_a}
-    set_b = {g.pattern_str for g in ghosts_b}
+    # The two extractions are independent parse-bound passes; overlap them
+    # on a 2-worker process pool.
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=2) as ex:
+        fa = ex.submit(extract_ghosts_from_atlas, atlas_a)
+        fb = ex.submit(extract_ghosts_from_atlas, atlas_b)
+        ghosts_a = fa.result()
+        ghosts_b = fb.result()
+
+    # Intern the pattern strings so the set algebra below compares shared
+    # strings by pointer before falling back to character comparison.
+    set_a = frozenset(sys.intern(g.pattern_str) for g in ghosts_a)
+    set_b = frozenset(sys.intern(g.pattern_str) for g in ghosts_b)
     
     k_a = ghosts_a[0].k if ghosts_a else "?"
     k_b = ghosts_b[0].k if ghosts_b else "?"
@@ -288,7 +491,7 @@ def cmd_ladder(args):
     if intersection:
         print(f"\nStable ghosts (persist across both k):")
         for p in sorted(intersection):
-            trivial = " [TRIVIAL]" if is_trivial_pattern(str_to_pattern(p)) else ""
+            trivial = " [TRIVIAL]" if is_trivial_pattern_str(p) else ""
             print(f"  [{p}]{trivial}")
     
     if only_a:
@@ -321,30 +524,35 @@ def cmd_report(args):
         print("No ghosts in registry. Run extract first.")
         return 0
     
-    # Group by pattern
-    by_pattern = defaultdict(list)
+    # Single pass over the registry: per-pattern k-set, trivial flag of the
+    # first observation, and the k distribution, instead of re-scanning the
+    # grouped lists once per derived statistic.
+    pattern_ks: Dict[str, Set[int]] = defaultdict(set)
+    pattern_trivial: Dict[str, bool] = {}
+    k_counts = defaultdict(int)
     for r in records:
-        by_pattern[r["pattern_str"]].append(r)
-    
+        pat_str = r["pattern_str"]
+        pattern_ks[pat_str].add(r["k"])
+        k_counts[r["k"]] += 1
+        if pat_str not in pattern_trivial:
+            pattern_trivial[pat_str] = bool(r.get("is_trivial"))
+
     # Analyze
-    trivial_count = sum(1 for p, obs in by_pattern.items() if obs[0].get("is_trivial"))
-    nontrivial_count = len(by_pattern) - trivial_count
-    
-    # k-value distribution
-    all_k = [r["k"] for r in records]
-    k_counts = defaultdict(int)
-    for k in all_k:
-        k_counts[k] += 1
-    
-    # Length distribution
+    trivial_count = sum(1 for t in pattern_trivial.values() if t)
+    nontrivial_count = len(pattern_ks) - trivial_count
+
+    # Length distribution (comma count + 1, no split allocation)
+    pattern_m = {p: p.count(",") + 1 for p in pattern_ks}
     m_counts = defaultdict(int)
-    for p in by_pattern.keys():
-        m = len(p.split(","))
+    for m in pattern_m.values():
         m_counts[m] += 1
-    
-    # Multi-k patterns (stable ghosts)
-    multi_k_patterns = [(p, obs) for p, obs in by_pattern.items() 
-                        if len(set(o["k"] for o in obs)) > 1]
+
+    # Multi-k patterns (stable ghosts): build the tuples pre-sorted so the
+    # sort compares ready-made keys instead of recomputing them per
+    # comparison.
+    multi_k_patterns = sorted(
+        (p, sorted(ks)) for p, ks in pattern_ks.items() if len(ks) > 1
+    )
     
     print("\n" + "="*60)
     print("           COLLATZ-GHOST: GHOST POPULATION REPORT")
@@ -352,7 +560,7 @@ def cmd_report(args):
     print(f"\nGenerated: {datetime.now().isoformat()}")
     print(f"\n--- Summary ---")
     print(f"Total ghost observations: {len(records)}")
-    print(f"Unique ghost patterns: {len(by_pattern)}")
+    print(f"Unique ghost patterns: {len(pattern_ks)}")
     print(f"  Trivial ([2,2,...] family): {trivial_count}")
     print(f"  Non-trivial: {nontrivial_count}")
     
@@ -366,17 +574,17 @@ def cmd_report(args):
     
     if multi_k_patterns:
         print(f"\n--- Stable Ghosts (observed at multiple k) ---")
-        for p, obs in sorted(multi_k_patterns, key=lambda x: x[0]):
-            k_vals = sorted(set(o["k"] for o in obs))
-            trivial = " [TRIVIAL]" if obs[0].get("is_trivial") else ""
+        for p, k_vals in multi_k_patterns:
+            trivial = " [TRIVIAL]" if pattern_trivial[p] else ""
             print(f"  [{p}] at k={k_vals}{trivial}")
-    
+
     print(f"\n--- Non-Trivial Ghosts ---")
-    nontrivial = [(p, obs) for p, obs in by_pattern.items() 
-                  if not obs[0].get("is_trivial")]
+    # Schwartzian transform: (M, pattern, k-list) tuples sort directly.
+    nontrivial = sorted(
+        (pattern_m[p], p, sorted(ks)) for p, ks in pattern_ks.items() if not pattern_trivial[p]
+    )
     if nontrivial:
-        for p, obs in sorted(nontrivial, key=lambda x: (len(x[0].split(",")), x[0])):
-            k_vals = sorted(set(o["k"] for o in obs))
+        for _, p, k_vals in nontrivial:
             print(f"  [{p}] at k={k_vals}")
     else:
         print("  None found! Only trivial ghosts exist.")
@@ -388,13 +596,13 @@ def cmd_report(args):
     analysis = {
         "generated": datetime.now().isoformat(),
         "total_observations": len(records),
-        "unique_patterns": len(by_pattern),
+        "unique_patterns": len(pattern_ks),
         "trivial_count": trivial_count,
         "nontrivial_count": nontrivial_count,
         "k_distribution": dict(k_counts),
         "m_distribution": dict(m_counts),
         "stable_ghosts": [p for p, _ in multi_k_patterns],
-        "nontrivial_ghosts": [p for p, obs in nontrivial],
+        "nontrivial_ghosts": [p for _, p, _ in nontrivial],
     }
     
     os.makedirs(os.path.dirname(GHOST_ANALYSIS), exist_ok=True)
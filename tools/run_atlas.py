@@ -23,11 +23,43 @@ import argparse
 import hashlib
 import json
 import os
+import re
 import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+
+# orjson is limited to 64-bit ints: dumps raises TypeError past 2^64 and
+# loads silently degrades such values to float. Ghost records carry
+# x0_candidate = x0 mod 2^k, which overflows exactly in the raise-k-and-
+# re-run workflow, so both directions fall back to stdlib json for the
+# records that need it. 19+ digit runs conservatively flag a possible
+# out-of-range int (2^63 is already 19 digits).
+_BIG_INT_RE = re.compile(rb"\d{19}")
+
+try:
+    import orjson
+    def _loads(data):
+        raw = data if isinstance(data, bytes) else data.encode("utf-8")
+        if _BIG_INT_RE.search(raw):
+            return json.loads(data)
+        return orjson.loads(data)
+    def _dumps(obj) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
+except ImportError:
+    _loads = json.loads
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, sort_keys=True).encode("utf-8")
+
+try:
+    from gmpy2 import mpz, bit_scan1  # GMP-backed bignums; optional
+except ImportError:
+    mpz = None
+    bit_scan1 = None
 
 # Paths
 ATLASES_DIR = "atlases"
@@ -53,11 +85,13 @@ def run_command(cmd: List[str], capture: bool = True) -> Tuple[int, str]:
 
 def sha256_file(path: str) -> str:
     """Compute SHA256 of a file."""
-    h = hashlib.sha256()
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
+        if hasattr(hashlib, "file_digest"):  # 3.11+: read/update loop in C
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(1 << 20), b""):
             h.update(chunk)
-    return h.hexdigest()
+        return h.hexdigest()
 
 
 def is_trivial_pattern(pat: List[int]) -> bool:
@@ -65,6 +99,41 @@ def is_trivial_pattern(pat: List[int]) -> bool:
     return all(x == 2 for x in pat)
 
 
+# Patterns repeat heavily across k-ladder runs; cache their string form so
+# the join + per-int str() happens once per distinct pattern.
+_pat_str_cache: Dict[tuple, str] = {}
+
+
+def pattern_to_str(pat: List[int]) -> str:
+    key = tuple(pat)
+    s = _pat_str_cache.get(key)
+    if s is None:
+        s = _pat_str_cache[key] = ",".join(map(str, pat))
+    return s
+
+
+def iter_jsonl_lines(path: str) -> Iterator[bytes]:
+    """Yield non-blank JSONL lines as bytes, reading in 1 MiB blocks.
+
+    Default text-mode line iteration decodes and allocates a str per line;
+    on multi-GB atlases the block read + bytes split is markedly faster and
+    feeds orjson.loads directly.
+    """
+    with open(path, "rb") as f:
+        tail = b""
+        while True:
+            block = f.read(1 << 20)
+            if not block:
+                break
+            lines = (tail + block).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield line
+        if tail.strip():
+            yield tail
+
+
 def verify_ghost_is_real_cycle(pattern: List[int], x0: int) -> Tuple[bool, List[int]]:
     """
     Verify if a ghost with given x0 is actually a real Collatz cycle.
@@ -72,122 +141,208 @@ def verify_ghost_is_real_cycle(pattern: List[int], x0: int) -> Tuple[bool, List[
     """
     if x0 <= 0:
         return False, []
-    
+
+    # gmpy2 keeps the loop in GMP: bit_scan1 is one C call where the pure
+    # Python v2 computation allocates two intermediate bignums per step.
+    # Candidates can be thousands of bits wide at large k, where this matters.
+    use_gmp = mpz is not None
     trajectory = [x0]
-    x = x0
-    
+    x = mpz(x0) if use_gmp else x0
+
     for i, a in enumerate(pattern):
         # Check: x must be odd
         if x % 2 == 0:
             return False, trajectory
-        
+
         # Compute 3x+1
         next_val = 3 * x + 1
-        
+
         # Check: v2(3x+1) must equal a
-        v2 = (next_val & -next_val).bit_length() - 1
+        if use_gmp:
+            v2 = bit_scan1(next_val)
+        else:
+            v2 = (next_val & -next_val).bit_length() - 1
         if v2 != a:
             return False, trajectory
-        
+
         # Compute next x
         x = next_val >> a
-        trajectory.append(x)
-    
+        trajectory.append(int(x))
+
     # Check closure: must return to x0
     if x == x0:
         return True, trajectory
-    
+
     return False, trajectory
 
 
+def iter_ghosts(atlas_path: str):
+    """Yield ghost dicts (Type B SAT records) from an atlas, streaming.
+
+    Generator form so callers can dedup/write/check each ghost inline
+    without ever holding the full ghost list in memory.
+    """
+    # One timestamp per extraction pass: datetime.now() is a syscall plus
+    # object construction, and all ghosts from one atlas share the run time.
+    now_iso = datetime.now().isoformat()
+    for line in iter_jsonl_lines(atlas_path):
+        # Type-A records are the majority of most atlases and are discarded
+        # anyway; a substring probe on the raw bytes skips their parse
+        # entirely (both compact and legacy spaced serializations).
+        if b'"type":"A"' in line or b'"type": "A"' in line:
+            continue
+        rec = _loads(line)
+
+        if rec.get("type") != "B":
+            continue
+
+        reason = rec.get("reason", "")
+        if "UNSAT" in reason or "SAT" not in reason:
+            continue
+
+        # This is a ghost (Type B SAT)
+        pattern = rec.get("pattern", [])
+        tree = rec.get("tree", {})
+        k = rec.get("k", 0)
+
+        # Extract x0 from tree
+        x0 = extract_x0_from_tree(tree)
+
+        yield {
+            "pattern": pattern,
+            "pattern_str": pattern_to_str(pattern),
+            "M": len(pattern),
+            "k": k,
+            "x0_candidate": x0,
+            "is_trivial": is_trivial_pattern(pattern),
+            "source_atlas": atlas_path,
+            "found_at": now_iso,
+        }
+
+
 def extract_ghosts_and_check_real(atlas_path: str) -> Tuple[List[Dict], List[Dict]]:
     """
     Extract ghosts from atlas and check if any are real cycles.
-    Returns (all_ghosts, real_cycles).
+    Returns (all_ghosts, real_cycles). Materializes both lists; main()'s
+    step 3 uses the streaming iter_ghosts pipeline instead.
     """
     ghosts = []
     real_cycles = []
-    
-    with open(atlas_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            rec = json.loads(line)
-            
-            if rec.get("type") != "B":
-                continue
-            
-            reason = rec.get("reason", "")
-            if "UNSAT" in reason or "SAT" not in reason:
-                continue
-            
-            # This is a ghost (Type B SAT)
-            pattern = rec.get("pattern", [])
-            tree = rec.get("tree", {})
-            k = rec.get("k", 0)
-            
-            # Extract x0 from tree
-            x0 = extract_x0_from_tree(tree)
-            
-            ghost = {
-                "pattern": pattern,
-                "pattern_str": ",".join(map(str, pattern)),
-                "M": len(pattern),
-                "k": k,
-                "x0_candidate": x0,
-                "is_trivial": is_trivial_pattern(pattern),
-                "source_atlas": atlas_path,
-                "found_at": datetime.now().isoformat(),
-            }
-            ghosts.append(ghost)
-            
-            # Check if this ghost is a REAL cycle
-            if x0 is not None and x0 > 0:
-                is_real, trajectory = verify_ghost_is_real_cycle(pattern, x0)
-                if is_real:
-                    real_cycle = {
-                        **ghost,
-                        "verified_real": True,
-                        "trajectory": trajectory,
-                    }
-                    real_cycles.append(real_cycle)
-    
+    for ghost in iter_ghosts(atlas_path):
+        ghosts.append(ghost)
+        x0 = ghost["x0_candidate"]
+        if x0 is not None and x0 > 0:
+            is_real, trajectory = verify_ghost_is_real_cycle(ghost["pattern"], x0)
+            if is_real:
+                real_cycles.append({**ghost, "verified_real": True, "trajectory": trajectory})
     return ghosts, real_cycles
 
 
 def extract_x0_from_tree(tree: dict) -> Optional[int]:
-    """Extract x0 from SAT leaf in proof tree."""
-    if tree.get("sat") is True:
-        return tree.get("x0_mod_2^m")
-    for child in tree.get("children", []):
-        result = extract_x0_from_tree(child)
-        if result is not None:
-            return result
+    """Extract x0 from SAT leaf in proof tree.
+
+    Explicit-stack DFS: proof trees are one level deep per branched bit, so
+    deep certificates would blow the recursion limit (and pay a Python call
+    per node). Children are pushed reversed to keep the left-to-right
+    first-match order of the recursive version.
+    """
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node.get("sat") is True:
+            return node.get("x0_mod_2^m")
+        children = node.get("children")
+        if children:
+            stack.extend(reversed(children))
     return None
 
 
-def save_ghosts_to_registry(ghosts: List[Dict], registry_path: str = GHOSTS_JSONL):
-    """Append ghosts to registry, avoiding duplicates."""
-    # Load existing
+def _load_registry_keys(registry_path: str) -> Tuple[set, bool]:
+    """Load the (pattern_str, k) key-set for the registry.
+
+    A sidecar `<registry>.keys` file (one `pattern_str\\tk` per line) caches
+    the keys so repeated runs skip reparsing the full JSONL; it is trusted
+    only while its mtime is >= the registry's. Returns (keys, from_cache).
+    """
+    keys_path = registry_path + ".keys"
     existing = set()
-    if os.path.exists(registry_path):
-        with open(registry_path, "r", encoding="utf-8") as f:
+    if not os.path.exists(registry_path):
+        return existing, False
+    if os.path.exists(keys_path) and os.path.getmtime(keys_path) >= os.path.getmtime(registry_path):
+        with open(keys_path, "r", encoding="utf-8") as f:
             for line in f:
-                if line.strip():
-                    rec = json.loads(line)
-                    existing.add((rec.get("pattern_str"), rec.get("k")))
-    
+                pat_str, sep, k = line.rstrip("\n").rpartition("\t")
+                if sep:
+                    existing.add((pat_str, int(k)))
+        return existing, True
+    for line in iter_jsonl_lines(registry_path):
+        rec = _loads(line)
+        existing.add((rec.get("pattern_str"), rec.get("k")))
+    return existing, False
+
+
+class _RegistryAppender:
+    """Append-only byte sink over a raw fd: records accumulate in a
+    bytearray and are flushed with one os.write per 64 KiB (and on close),
+    skipping the text-layer encoding and per-record write calls."""
+
+    _FLUSH_BYTES = 65536
+
+    def __init__(self, path: str):
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._buf = bytearray()
+
+    def write(self, data: bytes) -> None:
+        self._buf += data
+        if len(self._buf) >= self._FLUSH_BYTES:
+            os.write(self._fd, self._buf)
+            self._buf.clear()
+
+    def close(self) -> None:
+        if self._buf:
+            os.write(self._fd, self._buf)
+            self._buf.clear()
+        os.close(self._fd)
+
+    def __enter__(self) -> "_RegistryAppender":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _update_registry_keys(registry_path: str, existing: set, new_keys: List[Tuple[str, int]], from_cache: bool):
+    """Refresh the sidecar after the registry write so its mtime stays >=
+    the registry's; a stale cache is rebuilt in full."""
+    keys_path = registry_path + ".keys"
+    if from_cache:
+        if new_keys:
+            with open(keys_path, "a", encoding="utf-8") as f:
+                f.writelines(f"{p}\t{k}\n" for p, k in new_keys)
+        else:
+            os.utime(keys_path)
+    else:
+        with open(keys_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{p}\t{k}\n" for p, k in sorted(existing))
+
+
+def save_ghosts_to_registry(ghosts: List[Dict], registry_path: str = GHOSTS_JSONL):
+    """Append ghosts to registry, avoiding duplicates."""
+    existing, from_cache = _load_registry_keys(registry_path)
+
     # Append new
     new_count = 0
-    with open(registry_path, "a", encoding="utf-8") as f:
+    new_keys = []
+    with _RegistryAppender(registry_path) as f:
         for ghost in ghosts:
             key = (ghost["pattern_str"], ghost["k"])
             if key not in existing:
-                f.write(json.dumps(ghost, sort_keys=True) + "\n")
+                f.write(_dumps(ghost) + b"\n")
                 existing.add(key)
+                new_keys.append(key)
                 new_count += 1
-    
+
+    _update_registry_keys(registry_path, existing, new_keys, from_cache)
     return new_count
 
 
@@ -238,18 +393,16 @@ def update_runs_csv(M: int, A: int, amin: int, k: int, count: int,
                     verify_ok: bool, wall_time: float, notes: str):
     """Append a row to RUNS.csv."""
     os.makedirs(REGISTRY_DIR, exist_ok=True)
-    
-    # Create header if file doesn't exist
-    if not os.path.exists(RUNS_CSV):
-        with open(RUNS_CSV, "w", encoding="utf-8") as f:
-            f.write("date,machine,git_commit,M,A,amin,k,count,outfile,batch_root,batch_hash,verify_ok,wall_time_s,notes\n")
-    
+
     # Get machine name
     import socket
     machine = socket.gethostname()[:10]
-    
-    # Append row
+
+    # Single append-mode open: tell() == 0 means a fresh file, so write the
+    # header in the same handle instead of a separate exists() + "w" pass.
     with open(RUNS_CSV, "a", encoding="utf-8") as f:
+        if f.tell() == 0:
+            f.write("date,machine,git_commit,M,A,amin,k,count,outfile,batch_root,batch_hash,verify_ok,wall_time_s,notes\n")
         row = [
             datetime.now().strftime("%Y-%m-%d"),
             machine,
@@ -272,13 +425,11 @@ def update_runs_csv(M: int, A: int, amin: int, k: int, count: int,
 def update_checksums(outfile: str, checksum: str):
     """Append checksum to CHECKSUMS.txt."""
     os.makedirs(REGISTRY_DIR, exist_ok=True)
-    
-    if not os.path.exists(CHECKSUMS_TXT):
-        with open(CHECKSUMS_TXT, "w", encoding="utf-8") as f:
+
+    with open(CHECKSUMS_TXT, "a", encoding="utf-8") as f:
+        if f.tell() == 0:
             f.write("# Collatz-Ghost Atlas Checksums\n")
             f.write("# Format: SHA256  filename\n\n")
-    
-    with open(CHECKSUMS_TXT, "a", encoding="utf-8") as f:
         f.write(f"{checksum}  {outfile}\n")
 
 
@@ -344,80 +495,131 @@ def main():
         print(output)
         return 1
     
-    # Parse output for batch info
+    # Parse output for batch info. prove-family's stdout is one
+    # pretty-printed JSON summary; slice from the first "{" to the last "}"
+    # so interleaved stderr noise does not break the parse.
     count = 0
     batch_root = ""
     batch_hash = ""
     try:
-        # The output is JSON, find the JSON object
-        for line in output.strip().split("\n"):
-            line = line.strip()
-            if line.startswith("{") and "count" in line:
-                result = json.loads(line)
-                count = result.get("count", 0)
-                batch_root = result.get("root", "")
-                batch_hash = result.get("batch_hash", "")
-                break
-    except:
+        start = output.find("{")
+        end = output.rfind("}")
+        if start != -1 and end > start:
+            result = _loads(output[start:end + 1])
+            count = result.get("count", 0)
+            batch_root = result.get("root", "")
+            batch_hash = result.get("batch_hash", "")
+    except Exception:
         pass
-    
-    # If count still 0, count lines in file
+
+    # If count still 0, count records in the file: mmap + substring find
+    # loop instead of re-reading the whole atlas line by line (mmap has no
+    # count(), so scan with C-level find per occurrence).
     if count == 0 and os.path.exists(outfile):
-        with open(outfile, "r") as f:
-            count = sum(1 for line in f if line.strip() and '"type": "A"' in line or '"type": "B"' in line)
-    
+        import mmap
+        with open(outfile, "rb") as f:
+            if os.fstat(f.fileno()).st_size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for needle in (b'"type":"A"', b'"type":"B"'):
+                        i = mm.find(needle)
+                        while i != -1:
+                            count += 1
+                            i = mm.find(needle, i + 1)
+
     print(f"  Completed: {count} patterns processed")
     
+    # =========================================================================
+    # STEPS 2-4 overlap: verification (step 2) and summary (step 4) are
+    # subprocesses that only read the finished atlas, so they run in
+    # background threads while ghost extraction (step 3) runs in-process.
+    # Results are consumed and printed in the original step order.
+    # =========================================================================
+    from concurrent.futures import ThreadPoolExecutor
+    pool = ThreadPoolExecutor(max_workers=2)
+    verify_cmd = ["collatz-ghost", "verify", "--cert", outfile]
+    summary_cmd = ["python3", "tools/summarize_atlas.py", outfile]
+    verify_future = pool.submit(subprocess.run, verify_cmd, capture_output=True, text=True)
+    summary_future = pool.submit(subprocess.run, summary_cmd, capture_output=True, text=True)
+
     # =========================================================================
     # STEP 2: Verify certificates
     # =========================================================================
     print("\n" + "=" * 60)
     print("STEP 2: Verifying certificates")
     print("=" * 60)
-    
-    cmd = ["collatz-ghost", "verify", "--cert", outfile]
-    code, output = run_command(cmd)
-    
-    verify_ok = (code == 0)
-    if verify_ok:
-        print("  ✓ All certificates verified")
-    else:
-        print("  ✗ VERIFICATION FAILED")
-        print(output)
-    
+    print(f"  Running: {' '.join(verify_cmd)} (in background)")
+
     # =========================================================================
     # STEP 3: Extract ghosts and check for real cycles
     # =========================================================================
     print("\n" + "=" * 60)
     print("STEP 3: Extracting ghosts and checking for real cycles")
     print("=" * 60)
-    
-    ghosts, real_cycles = extract_ghosts_and_check_real(outfile)
-    
-    trivial_ghosts = [g for g in ghosts if g.get("is_trivial")]
-    nontrivial_ghosts = [g for g in ghosts if not g.get("is_trivial")]
-    
-    print(f"  Ghosts found: {len(ghosts)}")
-    print(f"    Trivial (x=1 cycle): {len(trivial_ghosts)}")
-    print(f"    Non-trivial: {len(nontrivial_ghosts)}")
-    
-    # Save to registry
-    new_ghosts = save_ghosts_to_registry(ghosts)
+
+    # Fused streaming pass: each ghost is deduped against the cached
+    # key-set, appended to the registry, and checked for a real cycle as it
+    # is parsed. Only counters, a small non-trivial preview, and any real
+    # cycles are retained, so memory stays flat on huge atlases.
+    try:
+        ghost_count = 0
+        trivial_count = 0
+        nontrivial_preview = []
+        real_cycles = []
+        new_ghosts = 0
+        new_keys = []
+        os.makedirs(REGISTRY_DIR, exist_ok=True)
+        existing, from_cache = _load_registry_keys(GHOSTS_JSONL)
+        with _RegistryAppender(GHOSTS_JSONL) as reg:
+            for ghost in iter_ghosts(outfile):
+                ghost_count += 1
+                if ghost["is_trivial"]:
+                    trivial_count += 1
+                elif len(nontrivial_preview) < 10:
+                    nontrivial_preview.append(ghost)
+
+                key = (ghost["pattern_str"], ghost["k"])
+                if key not in existing:
+                    reg.write(_dumps(ghost) + b"\n")
+                    existing.add(key)
+                    new_keys.append(key)
+                    new_ghosts += 1
+
+                x0 = ghost["x0_candidate"]
+                if x0 is not None and x0 > 0:
+                    is_real, trajectory = verify_ghost_is_real_cycle(ghost["pattern"], x0)
+                    if is_real:
+                        real_cycles.append({**ghost, "verified_real": True, "trajectory": trajectory})
+        _update_registry_keys(GHOSTS_JSONL, existing, new_keys, from_cache)
+        nontrivial_count = ghost_count - trivial_count
+
+        result = verify_future.result()
+        verify_ok = (result.returncode == 0)
+        if verify_ok:
+            print("  ✓ All certificates verified")
+        else:
+            print("  ✗ VERIFICATION FAILED")
+            print(result.stdout + result.stderr)
+    finally:
+        pool.shutdown(wait=True)
+
+    print(f"  Ghosts found: {ghost_count}")
+    print(f"    Trivial (x=1 cycle): {trivial_count}")
+    print(f"    Non-trivial: {nontrivial_count}")
     print(f"  New ghosts added to registry: {new_ghosts}")
-    
+
     # Check for real cycles
     nontrivial_real = [c for c in real_cycles if not c.get("is_trivial")]
     if nontrivial_real:
         handle_real_cycle_found(nontrivial_real)
         # This is historic - stop everything
         return 99  # Special exit code for "cycle found"
-    
-    if nontrivial_ghosts:
+
+    if nontrivial_count:
         print("\n  ⚠️  NON-TRIVIAL GHOSTS (not verified as real cycles):")
-        for g in nontrivial_ghosts[:10]:
+        for g in nontrivial_preview:
             print(f"      [{g['pattern_str']}] x0={g.get('x0_candidate')}")
-        if len(nontrivial_ghosts) > 10:
-            print(f"      ... and {len(nontrivial_ghosts) - 10} more")
+        if nontrivial_count > 10:
+            print(f"      ... and {nontrivial_count - 10} more")
         print("\n  These patterns could not be excluded at k={args.k}.")
         print("  Consider running at higher k to see if they vanish.")
     
@@ -430,13 +632,12 @@ def main():
     
     os.makedirs(SUMMARIES_DIR, exist_ok=True)
     summary_file = f"{SUMMARIES_DIR}/summary_M{args.M}_A{args.A}_amin{args.amin}_k{args.k}.txt"
-    
-    cmd = ["python3", "tools/summarize_atlas.py", outfile]
-    code, output = run_command(cmd)
-    
+
+    # Summarize was launched alongside step 2; just collect its output here.
+    result = summary_future.result()
     with open(summary_file, "w", encoding="utf-8") as f:
-        f.write(output)
-    
+        f.write(result.stdout + result.stderr)
+
     print(f"  Summary saved to: {summary_file}")
     
     # =========================================================================
@@ -453,7 +654,7 @@ def main():
     checksum = sha256_file(outfile)
     
     # Notes
-    notes = f"{len(trivial_ghosts)} trivial + {len(nontrivial_ghosts)} non-trivial ghosts"
+    notes = f"{trivial_count} trivial + {nontrivial_count} non-trivial ghosts"
     if args.scout:
         notes = f"SCOUT: {notes}"
     
@@ -480,7 +681,7 @@ def main():
   Atlas: {outfile}
   Patterns: {count}
   Verified: {'✓ YES' if verify_ok else '✗ NO'}
-  Ghosts: {len(ghosts)} ({len(trivial_ghosts)} trivial, {len(nontrivial_ghosts)} non-trivial)
+  Ghosts: {ghost_count} ({trivial_count} trivial, {nontrivial_count} non-trivial)
   Time: {wall_time:.1f}s
   Checksum: {checksum[:16]}...
   
@@ -492,7 +693,7 @@ def main():
     - {GHOSTS_JSONL}
 """)
     
-    if nontrivial_ghosts:
+    if nontrivial_count:
         print("  ⚠️  Non-trivial ghosts found - consider running at higher k")
     else:
         print("  ✓ All patterns excluded (except trivial cycle)")
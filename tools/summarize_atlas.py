@@ -19,20 +19,137 @@ Notes:
 """
 
 import argparse
+import heapq
 import json
+import mmap
+import os
+import sys
 from collections import Counter, defaultdict
-from typing import Dict, Any, List, Tuple, Optional
-
-
-def parse_jsonl(path: str) -> List[Dict[str, Any]]:
-    recs = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
+from typing import Dict, Any, List, Sequence, Tuple, Optional
+
+try:
+    import orjson  # C/SIMD-accelerated parser + serializer; optional
+    _loads = orjson.loads
+
+    def _dumps_pretty(obj: Any) -> str:
+        # NON_STR_KEYS: value_hist is keyed by int exponents, which stdlib
+        # json coerces to strings; keep that behavior.
+        return orjson.dumps(
+            obj,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        ).decode()
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_pretty(obj: Any) -> str:
+        return json.dumps(obj, indent=2, sort_keys=True)
+
+try:
+    import numpy as np  # optional; vectorized motif stats
+except ImportError:
+    np = None
+
+try:
+    from numba import njit  # optional; JIT-compiled histogram kernel
+except ImportError:
+    njit = None
+
+HAVE_NUMBA = njit is not None and np is not None
+
+# Run lengths are bounded by the kernel's dense (value, length) table;
+# records that do not fit take the per-record Counter path instead.
+_KERNEL_MAX_RUN = 4096
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _hist_kernel(flat, flat64, offsets):  # pragma: no cover - needs numba
+        """Value + run-length histograms over concatenated uint8 patterns.
+
+        flat holds all pattern bytes back to back; offsets[r]:offsets[r+1]
+        delimits record r. flat64 is the same buffer viewed as aligned
+        uint64 words: while the next 8 bytes all repeat the current value
+        (one compare against the value splatted across a word, SWAR-style)
+        the run advances 8 lanes per iteration instead of 1, which is
+        where long monotone runs spend their time. Mixed words fall back
+        to the scalar lane since run extraction needs each boundary
+        anyway. Returns dense (value_hist[256],
+        run_hist[256, _KERNEL_MAX_RUN]) arrays; no per-element boxing.
+        """
+        val_hist = np.zeros(256, np.int64)
+        run_hist = np.zeros((256, _KERNEL_MAX_RUN), np.int64)
+        ones = np.uint64(0x0101010101010101)
+        for r in range(offsets.shape[0] - 1):
+            start = offsets[r]
+            end = offsets[r + 1]
+            if start == end:
                 continue
-            recs.append(json.loads(line))
-    return recs
+            cur = flat[start]
+            ln = 1
+            val_hist[cur] += 1
+            i = start + 1
+            while i < end:
+                if (i & 7) == 0 and i + 8 <= end:
+                    rep = ones * np.uint64(cur)
+                    while i + 8 <= end and flat64[i >> 3] == rep:
+                        val_hist[cur] += 8
+                        ln += 8
+                        i += 8
+                    if i >= end:
+                        break
+                x = flat[i]
+                val_hist[x] += 1
+                if x == cur:
+                    ln += 1
+                else:
+                    run_hist[cur, ln] += 1
+                    cur = x
+                    ln = 1
+                i += 1
+            run_hist[cur, ln] += 1
+        return val_hist, run_hist
+
+
+def parse_jsonl(path: str):
+    """Yield one parsed record per JSONL line, streaming.
+
+    Generator form: summarize touches each record once, so holding the full
+    list would only inflate peak memory on large atlases.
+
+    Lines with neither a "pattern" field nor a BATCH marker are skipped on
+    the raw bytes (C-level substring scan) without being parsed at all —
+    summarize discards such records anyway.
+
+    The file is mmapped so line splitting scans the page cache directly
+    instead of copying through a userspace read buffer.
+    """
+    for _, rec in _iter_line_recs(_iter_lines(path)):
+        yield rec
+
+
+def _iter_lines(path: str):
+    """Yield raw JSONL lines from the whole file, via mmap."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield from iter(mm.readline, b"")
+        finally:
+            mm.close()
+
+
+def _iter_line_recs(lines):
+    """Yield (raw_line, parsed_record) pairs, applying the bytes prefilter.
+
+    The raw line rides along so the hot loop can answer substring
+    questions (SAT vs UNSAT) with one C memmem instead of re-searching
+    the decoded reason string.
+    """
+    for line in lines:
+        if b'"pattern"' not in line and b'"BATCH"' not in line:
+            continue
+        yield line, _loads(line)
 
 
 def is_type_b_sat(rec: Dict[str, Any]) -> bool:
@@ -50,10 +167,53 @@ def pattern_to_str(pat: List[int]) -> str:
     return ",".join(map(str, pat))
 
 
-def run_lengths(pat: List[int]) -> Counter:
+def pattern_key(pat: List[int]) -> bytes:
+    """Compact hashable key for a pattern: one byte per exponent.
+
+    bytes hash/compare faster than the comma-joined strings and are built
+    once at ingest instead of per compare. Patterns that do not fit one
+    byte per entry (never seen in practice) use a 0xff-prefixed CSV
+    encoding; raw keys never start with 0xff, so the forms cannot collide.
+    """
+    try:
+        key = bytes(bytearray(pat))
+    except ValueError:
+        key = None
+    if key is not None and not key.startswith(b"\xff"):
+        return key
+    return b"\xff" + pattern_to_str(pat).encode("ascii")
+
+
+def key_to_str(key: bytes) -> str:
+    if key.startswith(b"\xff"):
+        return key[1:].decode("ascii")
+    return ",".join(map(str, key))
+
+
+def key_to_list(key: bytes) -> List[int]:
+    if key.startswith(b"\xff"):
+        return [int(s) for s in key[1:].decode("ascii").split(",")]
+    return list(key)
+
+
+def run_lengths(pat: Sequence[int]) -> Counter:
     c = Counter()
     if not pat:
         return c
+    if np is not None and len(pat) > 32:
+        # Vectorized RLE: run boundaries are the positions where adjacent
+        # elements differ; the comparison runs in C instead of one Python
+        # iteration per element. Short patterns stay on the scalar path
+        # where array construction overhead would dominate.
+        if isinstance(pat, (bytes, bytearray)):
+            a = np.frombuffer(pat, dtype=np.uint8).astype(np.int64)
+        else:
+            a = np.asarray(pat, dtype=np.int64)
+        idx = np.flatnonzero(a[1:] != a[:-1]) + 1
+        starts = np.concatenate(([0], idx))
+        ends = np.concatenate((idx, [len(a)]))
+        c.update(zip(a[starts].tolist(), (ends - starts).tolist()))
+        return c
     cur = pat[0]
     ln = 1
     for x in pat[1:]:
@@ -67,19 +227,120 @@ def run_lengths(pat: List[int]) -> Counter:
     return c
 
 
-def summarize(path: str) -> Dict[str, Any]:
-    recs = parse_jsonl(path)
-
+# Atlases below this size stay on the single-pass path: forking workers and
+# pickling partial results back costs more than the parse it would save.
+_SHARD_MIN_BYTES = 16 << 20
+
+
+def _iter_lines_range(path: str, start: int, end: int):
+    """Yield the JSONL lines whose first byte lies in [start, end).
+
+    A line straddling `end` belongs wholly to this shard; the next shard
+    detects it landed mid-line (previous byte is not a newline) and skips
+    forward to its first full line. JSONL records are line-independent, so
+    shards share nothing.
+
+    Line boundaries come from mmap.find, so the scan to each newline runs
+    in C over the page cache with no per-line seek/tell bookkeeping.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0 or start >= size:
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            pos = start
+            if start and mm[start - 1:start] != b"\n":
+                pos = mm.find(b"\n", start) + 1
+                if pos == 0:  # no full line begins in this shard
+                    return
+            while pos < end:
+                nl = mm.find(b"\n", pos)
+                if nl == -1:
+                    yield mm[pos:size]
+                    return
+                yield mm[pos:nl + 1]
+                pos = nl + 1
+        finally:
+            mm.close()
+
+
+def _shard_worker(path: str, start: int, end: int, keep_patterns: bool, sat_preview: int) -> Dict[str, Any]:
+    return _accumulate(
+        _iter_line_recs(_iter_lines_range(path, start, end)),
+        keep_patterns,
+        sat_preview,
+    )
+
+
+def _accumulate(records, keep_patterns: bool = True, sat_preview: int = 50) -> Dict[str, Any]:
+    """Tally one stream of (raw_line, record) pairs into a mergeable partial summary.
+
+    Both the single-pass path and the shard workers run this; the partials
+    hold only Counters, lists and the BATCH dict, so they pickle cheaply
+    back from worker processes.
+
+    With keep_patterns=False only counts and histograms are tallied; the
+    pattern lists stay empty apart from a bounded SAT preview of up to
+    `sat_preview` entries, keeping memory flat on count-only runs.
+    """
     counts = Counter()
-    sat_patterns: List[List[int]] = []
-    unsat_patterns: List[List[int]] = []
-    type_a_patterns: List[List[int]] = []
+    sat_patterns: List[bytes] = []
+    sat_seen: set = set()
+    unsat_patterns: List[bytes] = []
+    unsat_seen: set = set()
+    type_a_patterns: List[bytes] = []
     batch = None
 
     value_hist = Counter()
     run_hist = Counter()
 
-    for rec in recs:
+    # With numpy, pattern bytes accumulate into one flat buffer + offsets
+    # and both histograms are computed in a single pass at the end — the
+    # JIT kernel when numba is present, otherwise one np.bincount plus a
+    # vectorized RLE over the concatenated buffer. Records whose
+    # values/lengths do not fit the dense tables fall back to the
+    # per-record Counter path.
+    use_flat = np is not None
+    if use_flat:
+        import array
+        flat = array.array("B")
+        offsets = [0]
+
+    # Per-type handlers dispatched through one dict lookup instead of a
+    # chain of string compares per record. Closures over the accumulator
+    # locals keep the state access as fast as the loop body had it.
+    def _on_a(line: bytes, key: bytes) -> None:
+        counts["A"] += 1
+        if keep_patterns:
+            type_a_patterns.append(key)
+
+    def _on_b(line: bytes, key: bytes) -> None:
+        # Same decision as is_type_b_sat, made on the raw bytes: one
+        # C substring scan apiece, no reason-field lookup. The solver's
+        # SAT reason can start mid-sentence ("valuation constraints SAT
+        # at target k"), so match the bare uppercase markers — they only
+        # ever occur in the reason field.
+        if b"UNSAT" not in line and b"SAT" in line:
+            counts["B_SAT"] += 1
+            # Exhaustive dumps can repeat patterns; the retained lists
+            # hold uniques only, which also bounds the compare sets.
+            # Counts still tally every record.
+            if (keep_patterns or len(sat_patterns) < sat_preview) and key not in sat_seen:
+                sat_seen.add(key)
+                sat_patterns.append(key)
+        else:
+            counts["B_UNSAT"] += 1
+            if keep_patterns and key not in unsat_seen:
+                unsat_seen.add(key)
+                unsat_patterns.append(key)
+
+    def _on_other(line: bytes, key: bytes) -> None:
+        counts["OTHER"] += 1
+
+    handlers = {"A": _on_a, "B": _on_b}
+
+    for line, rec in records:
         t = rec.get("type")
         if t == "BATCH":
             batch = rec
@@ -89,49 +350,159 @@ def summarize(path: str) -> Dict[str, Any]:
         if not isinstance(pat, list):
             continue
 
+        # One compact buffer per record: the fresh PyLong list from json is
+        # reduced to 1 byte/element immediately and everything downstream
+        # (histograms, flat buffer, dedup keys, retained lists) shares that
+        # single bytes object instead of re-deriving it.
+        key = pattern_key(pat)
+        compact = not key.startswith(b"\xff")
+
         # motif stats
-        value_hist.update(pat)
-        run_hist.update(run_lengths(pat))
-
-        if t == "A":
-            counts["A"] += 1
-            type_a_patterns.append(pat)
-        elif t == "B":
-            if is_type_b_sat(rec):
-                counts["B_SAT"] += 1
-                sat_patterns.append(pat)
-            else:
-                counts["B_UNSAT"] += 1
-                unsat_patterns.append(pat)
+        if use_flat and compact and pat and len(pat) < _KERNEL_MAX_RUN:
+            flat.frombytes(key)  # C memcpy into the flat buffer
+            offsets.append(len(flat))
+        elif compact:
+            # Counter.update over bytes walks the C buffer and reuses the
+            # interned small ints.
+            value_hist.update(key)
+            run_hist.update(run_lengths(key))
+        else:
+            value_hist.update(pat)
+            run_hist.update(run_lengths(pat))
+
+        handlers.get(t, _on_other)(line, key)
+
+    if use_flat and len(offsets) > 1:
+        buf = np.frombuffer(flat, dtype=np.uint8)
+        off = np.asarray(offsets, dtype=np.int64)
+        if HAVE_NUMBA:
+            flat64 = buf[: buf.shape[0] & ~7].view(np.uint64)
+            val_arr, run_arr = _hist_kernel(buf, flat64, off)
+            value_hist.update({int(v): int(n) for v, n in enumerate(val_arr) if n})
+            vs, ls = np.nonzero(run_arr)
+            run_hist.update({(int(v), int(l)): int(run_arr[v, l]) for v, l in zip(vs, ls)})
         else:
-            counts["OTHER"] += 1
+            value_hist.update({int(v): int(n) for v, n in enumerate(np.bincount(buf, minlength=256)) if n})
+            # RLE over the whole concatenated buffer: a run breaks where
+            # adjacent bytes differ or at a record boundary, so runs never
+            # bleed across records.
+            a = buf.astype(np.int64)
+            bounds = np.union1d(np.flatnonzero(a[1:] != a[:-1]) + 1, off[1:-1])
+            starts = np.concatenate(([0], bounds))
+            ends = np.concatenate((bounds, [a.shape[0]]))
+            run_hist.update(zip(a[starts].tolist(), (ends - starts).tolist()))
 
+    return {
+        "counts": counts,
+        "batch": batch,
+        "sat_patterns": sat_patterns,
+        "unsat_patterns": unsat_patterns,
+        "type_a_patterns": type_a_patterns,
+        "value_hist": value_hist,
+        "run_hist": run_hist,
+    }
+
+
+def summarize(path: str, keep_patterns: bool = True, sat_preview: int = 50) -> Dict[str, Any]:
+    size = os.stat(path).st_size
+    workers = os.cpu_count() or 1
+    if size >= _SHARD_MIN_BYTES and workers > 1:
+        # Shard-parallel pass: split into byte ranges aligned to newlines
+        # and parse each on its own core, then merge the partial tallies.
+        from concurrent.futures import ProcessPoolExecutor
+        bounds = [size * i // workers for i in range(workers + 1)]
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            parts = list(ex.map(
+                _shard_worker,
+                [path] * workers,
+                bounds[:-1],
+                bounds[1:],
+                [keep_patterns] * workers,
+                [sat_preview] * workers,
+            ))
+    else:
+        parts = [_accumulate(_iter_line_recs(_iter_lines(path)), keep_patterns, sat_preview)]
+
+    acc = parts[0]
+    # Re-apply the ingest dedup across shard boundaries: each shard only
+    # saw its own duplicates.
+    sat_seen = set(acc["sat_patterns"])
+    unsat_seen = set(acc["unsat_patterns"])
+    for part in parts[1:]:
+        acc["counts"] += part["counts"]
+        acc["value_hist"] += part["value_hist"]
+        acc["run_hist"] += part["run_hist"]
+        for k in part["sat_patterns"]:
+            if k not in sat_seen:
+                sat_seen.add(k)
+                acc["sat_patterns"].append(k)
+        for k in part["unsat_patterns"]:
+            if k not in unsat_seen:
+                unsat_seen.add(k)
+                acc["unsat_patterns"].append(k)
+        acc["type_a_patterns"].extend(part["type_a_patterns"])
+        if acc["batch"] is None:
+            acc["batch"] = part["batch"]
+    if not keep_patterns:
+        # Shards each kept up to sat_preview entries in file order; re-cap
+        # the merged preview to the same bound.
+        del acc["sat_patterns"][sat_preview:]
+
+    counts = acc["counts"]
+    run_hist = acc["run_hist"]
     total = counts["A"] + counts["B_SAT"] + counts["B_UNSAT"]
 
     out = {
         "file": path,
         "total_patterns": total,
         "counts": dict(counts),
-        "batch": batch,
-        "sat_patterns": sat_patterns,
-        "unsat_patterns": unsat_patterns,
-        "type_a_patterns": type_a_patterns,
-        "value_hist": dict(value_hist),
+        "batch": acc["batch"],
+        # Patterns are held as compact bytes during the pass; decode back to
+        # int lists only here, at the public-schema boundary.
+        "sat_patterns": [key_to_list(k) for k in acc["sat_patterns"]],
+        # Already unique after the ingest dedup; compare_sat builds its
+        # sets straight from these.
+        "sat_keys": acc["sat_patterns"] if keep_patterns else [],
+        "unsat_patterns": [key_to_list(k) for k in acc["unsat_patterns"]],
+        "type_a_patterns": [key_to_list(k) for k in acc["type_a_patterns"]],
+        "value_hist": dict(acc["value_hist"]),
         "run_hist_top20": [
-            {"value": v, "run_len": l, "count": run_hist[(v, l)]}
-            for (v, l) in run_hist.most_common(20)
+            {"value": v, "run_len": l, "count": n}
+            for (v, l), n in run_hist.most_common(20)
         ],
     }
     return out
 
 
-def compare_sat(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
-    sat_a = {pattern_to_str(p) for p in a["sat_patterns"]}
-    sat_b = {pattern_to_str(p) for p in b["sat_patterns"]}
+# Below this many combined keys the plain set algebra wins; above it the
+# numpy sorted-merge over 8-byte fingerprints avoids per-key dict probes.
+_FP_THRESHOLD = 1 << 16
 
-    inter = sat_a & sat_b
-    only_a = sat_a - sat_b
-    only_b = sat_b - sat_a
+
+def compare_sat(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    # Set algebra over the compact bytes keys built at ingest; patterns are
+    # only decoded back to CSV for the capped listings actually emitted.
+    sat_a = set(a["sat_keys"])
+    sat_b = set(b["sat_keys"])
+
+    if np is not None and len(sat_a) + len(sat_b) >= _FP_THRESHOLD:
+        # Vectorized path: hash each key to uint64 once (in this process,
+        # so the salted hashes are mutually consistent) and run the
+        # intersections as C sorted merges. A 64-bit collision between
+        # distinct patterns would misplace a pair; with < 2^32 patterns the
+        # odds are negligible for a summary report.
+        by_fp_a = {hash(k) & 0xFFFFFFFFFFFFFFFF: k for k in sat_a}
+        by_fp_b = {hash(k) & 0xFFFFFFFFFFFFFFFF: k for k in sat_b}
+        fp_a = np.fromiter(by_fp_a.keys(), dtype=np.uint64, count=len(by_fp_a))
+        fp_b = np.fromiter(by_fp_b.keys(), dtype=np.uint64, count=len(by_fp_b))
+        inter_fp = np.intersect1d(fp_a, fp_b, assume_unique=True)
+        inter = {by_fp_a[int(f)] for f in inter_fp}
+        only_a = {by_fp_a[int(f)] for f in np.setdiff1d(fp_a, fp_b, assume_unique=True)}
+        only_b = {by_fp_b[int(f)] for f in np.setdiff1d(fp_b, fp_a, assume_unique=True)}
+    else:
+        inter = sat_a & sat_b
+        only_a = sat_a - sat_b
+        only_b = sat_b - sat_a
 
     return {
         "sat_count_a": len(sat_a),
@@ -139,9 +510,11 @@ def compare_sat(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
         "intersection": len(inter),
         "only_a": len(only_a),
         "only_b": len(only_b),
-        "intersection_patterns": sorted(list(inter))[:200],  # cap to avoid huge output
-        "only_a_patterns": sorted(list(only_a))[:200],
-        "only_b_patterns": sorted(list(only_b))[:200],
+        # Bounded-heap selection: only the 200 keys actually emitted are
+        # sorted, instead of a full O(N log N) sort of each set.
+        "intersection_patterns": [key_to_str(k) for k in heapq.nsmallest(200, inter)],
+        "only_a_patterns": [key_to_str(k) for k in heapq.nsmallest(200, only_a)],
+        "only_b_patterns": [key_to_str(k) for k in heapq.nsmallest(200, only_b)],
     }
 
 
@@ -154,62 +527,77 @@ def main():
     ap.add_argument("--json", action="store_true", help="Emit machine-readable JSON summary")
     args = ap.parse_args()
 
-    s1 = summarize(args.atlas)
-
     if args.compare:
-        s2 = summarize(args.compare)
+        # Two independent parse-bound passes; overlap them on two workers.
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=2) as ex:
+            f1 = ex.submit(summarize, args.atlas)
+            f2 = ex.submit(summarize, args.compare)
+            s1 = f1.result()
+            s2 = f2.result()
         comp = compare_sat(s1, s2)
     else:
+        # Count-only runs print just counts/histograms plus a bounded SAT
+        # preview; skip retaining the full pattern lists.
+        keep = args.show_sat or args.json
+        s1 = summarize(args.atlas, keep_patterns=keep, sat_preview=args.top_sat)
         s2 = None
         comp = None
 
     if args.json:
-        out = {"summary": s1}
+        # sat_keys are internal bytes objects for compare_sat, not JSON.
+        out = {"summary": {k: v for k, v in s1.items() if k != "sat_keys"}}
         if s2:
-            out["summary_compare"] = s2
+            out["summary_compare"] = {k: v for k, v in s2.items() if k != "sat_keys"}
         if comp:
             out["sat_compare"] = comp
-        print(json.dumps(out, indent=2, sort_keys=True))
+        print(_dumps_pretty(out))
         return
 
-    # Human-readable report
-    print("\n=== Atlas summary ===")
-    print(f"File: {s1['file']}")
+    # Human-readable report. Lines accumulate into one buffer flushed with
+    # a single write: one syscall instead of one per print, which matters
+    # when large histograms are piped to a file.
+    parts: List[str] = []
+    parts.append("\n=== Atlas summary ===")
+    parts.append(f"File: {s1['file']}")
     if s1["batch"]:
         fam = s1["batch"].get("family", {})
-        print(f"Family: {fam} | batch root: {s1['batch'].get('root')}")
-    print(f"Total patterns: {s1['total_patterns']}")
-    print("Counts:", s1["counts"])
+        parts.append(f"Family: {fam} | batch root: {s1['batch'].get('root')}")
+    parts.append(f"Total patterns: {s1['total_patterns']}")
+    parts.append(f"Counts: {s1['counts']}")
 
     total = s1["total_patterns"] or 1
     a = s1["counts"].get("A", 0)
     bu = s1["counts"].get("B_UNSAT", 0)
     bs = s1["counts"].get("B_SAT", 0)
-    print(f"Fractions: A={a/total:.4f}, B_UNSAT={bu/total:.4f}, B_SAT={bs/total:.4f}")
+    parts.append(f"Fractions: A={a/total:.4f}, B_UNSAT={bu/total:.4f}, B_SAT={bs/total:.4f}")
 
-    print("\nValue histogram (exponent frequencies):")
+    parts.append("\nValue histogram (exponent frequencies):")
     for k in sorted(s1["value_hist"].keys()):
-        print(f"  {k}: {s1['value_hist'][k]}")
+        parts.append(f"  {k}: {s1['value_hist'][k]}")
 
-    print("\nTop run-length motifs (value, run_len -> count):")
+    parts.append("\nTop run-length motifs (value, run_len -> count):")
     for item in s1["run_hist_top20"]:
-        print(f"  ({item['value']}, {item['run_len']}): {item['count']}")
+        parts.append(f"  ({item['value']}, {item['run_len']}): {item['count']}")
 
     if args.show_sat:
-        print(f"\nSAT patterns (showing up to {args.top_sat}):")
+        parts.append(f"\nSAT patterns (showing up to {args.top_sat}):")
         for p in s1["sat_patterns"][: args.top_sat]:
-            print(" ", pattern_to_str(p))
+            parts.append(f"  {pattern_to_str(p)}")
 
     if comp:
-        print("\n=== SAT set comparison ===")
-        print(f"A: {args.atlas}")
-        print(f"B: {args.compare}")
-        print(json.dumps(comp, indent=2))
+        parts.append("\n=== SAT set comparison ===")
+        parts.append(f"A: {args.atlas}")
+        parts.append(f"B: {args.compare}")
+        parts.append(_dumps_pretty(comp))
 
         if args.show_sat:
-            print("\nIntersection SAT patterns (first 200):")
+            parts.append("\nIntersection SAT patterns (first 200):")
             for p in comp["intersection_patterns"]:
-                print(" ", p)
+                parts.append(f"  {p}")
+
+    parts.append("")
+    sys.stdout.write("\n".join(parts))
 
 
 if __name__ == "__main__":